@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from typing import Any, Optional
 from fastapi.responses import JSONResponse
 
 from app.core.config import get_settings
-from app.database.base import get_db
+from app.database.base import get_async_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token, UserLogin
 from app.core.security import create_access_token
@@ -27,11 +28,12 @@ settings = get_settings()
 async def register(
     user_in: UserCreate,
     response: Response,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Register a new user and set auth cookie"""
     # Check if user with this email already exists
-    user = db.query(User).filter(User.email == user_in.email).first()
+    result = await db.execute(select(User).filter(User.email == user_in.email))
+    user = result.scalars().first()
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -46,8 +48,8 @@ async def register(
         last_login=datetime.utcnow()
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     # Create access token and set cookie
     access_token = create_access_token(
@@ -66,11 +68,12 @@ async def register(
 async def login(
     user_in: UserLogin,
     response: Response,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Login user and set auth cookie"""
     # Find user by email
-    user = db.query(User).filter(User.email == user_in.email).first()
+    result = await db.execute(select(User).filter(User.email == user_in.email))
+    user = result.scalars().first()
     if not user or not user.verify_password(user_in.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -79,7 +82,9 @@ async def login(
         )  
     # Update last login
     user.last_login = datetime.utcnow()
-    db.commit()
+    await db.commit()
+    # updated_at is set server-side, reload it before the response is built
+    await db.refresh(user)
     
     # Create access token and set cookie
     access_token = create_access_token(
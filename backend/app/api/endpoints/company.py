@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database.base import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database.base import get_async_db
 from app.models.company import Company
 from app.models.user import User
 from app.schemas.company import CompanyCreate, CompanyUpdate, CompanyResponse, ImportEmployeesResponse
 from app.utils.sync_employees import GreytHREmployeeSync
+from app.services.employee_directory import employee_directory
+from app.services.leave_cache import leave_cache
+from app.services.greyt_hr_tokens import token_manager
+from app.services.greyt_hr import leave_api
 from app.core.security import get_current_user_from_cookie
 
 router = APIRouter()
@@ -13,7 +18,7 @@ router = APIRouter()
 @router.post("/", response_model=CompanyResponse)
 async def create_company(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     company_in: CompanyCreate,
     current_user: User = Depends(get_current_user_from_cookie)
 ):
@@ -21,10 +26,11 @@ async def create_company(
     Create a new company with GreytHR credentials.
     """
     # Check if company with same name exists for this user
-    company = db.query(Company).filter(
+    result = await db.execute(select(Company).filter(
         Company.name == company_in.name,
         Company.user_id == current_user.id
-    ).first()
+    ))
+    company = result.scalars().first()
     
     if company:
         raise HTTPException(
@@ -41,18 +47,20 @@ async def create_company(
     company.set_greyt_hr_password(company_in.greyt_hr_password)
     
     db.add(company)
-    db.commit()
-    db.refresh(company)
+    await db.commit()
+    await db.refresh(company)
     
     # Get GreytHR token and import employees for the new company
     try:
         # Get token using the new function that accepts company object
         syncer = GreytHREmployeeSync(company)
         await syncer.sync_to_database(db)
+        # The sync may have stored a new token, which resets server-side updated_at
+        await db.refresh(company)
     except Exception as e:
         # If employee import fails, delete the company
-        db.delete(company)
-        db.commit()
+        await db.delete(company)
+        await db.commit()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to import employees: {str(e)}"
@@ -63,7 +71,7 @@ async def create_company(
 @router.put("/{company_name}", response_model=CompanyResponse)
 async def update_company(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     company_name: str,
     company_in: CompanyUpdate,
     current_user: User = Depends(get_current_user_from_cookie)
@@ -73,10 +81,11 @@ async def update_company(
     Users can only update their own companies.
     Company is identified by name (which is unique per user).
     """
-    company = db.query(Company).filter(
+    result = await db.execute(select(Company).filter(
         Company.name == company_name,
         Company.user_id == current_user.id
-    ).first()
+    ))
+    company = result.scalars().first()
     
     if not company:
         raise HTTPException(
@@ -86,11 +95,12 @@ async def update_company(
     
     # Check for unique constraints if updating name
     if company_in.name and company_in.name != company.name:
-        existing_company = db.query(Company).filter(
+        result = await db.execute(select(Company).filter(
             Company.name == company_in.name,
             Company.user_id == current_user.id,
             Company.id != company.id
-        ).first()
+        ))
+        existing_company = result.scalars().first()
         
         if existing_company:
             raise HTTPException(
@@ -99,6 +109,7 @@ async def update_company(
             )
     
     # Update company details
+    old_name = company.name
     if company_in.name is not None:
         company.name = company_in.name
     if company_in.greyt_hr_username is not None:
@@ -107,17 +118,28 @@ async def update_company(
         company.set_greyt_hr_password(company_in.greyt_hr_password)
     
     db.add(company)
-    db.commit()
-    db.refresh(company)
+    await db.commit()
+    await db.refresh(company)
+    
+    # The GreytHR domain comes from the name: rebuild the directory's company
+    # handle and drop the client, token and leave data tied to the old domain
+    if company.name != old_name:
+        await employee_directory.reload()
+        leave_api.drop_tenant(company.id)
+        token_manager.invalidate(company.id)
+        leave_cache.purge(company.id)
     
     # If GreytHR credentials were updated, reimport employees
     if any([
         company_in.greyt_hr_username is not None,
         company_in.greyt_hr_password is not None
     ]):
+        # The cached token belongs to the old credentials
+        token_manager.invalidate(company.id)
         try:
             syncer = GreytHREmployeeSync(company)
             await syncer.sync_to_database(db)
+            await db.refresh(company)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -127,9 +149,9 @@ async def update_company(
     return company
 
 @router.get("/{company_name}", response_model=CompanyResponse)
-def get_company(
+async def get_company(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     company_name: str,
     current_user: User = Depends(get_current_user_from_cookie)
 ):
@@ -138,10 +160,11 @@ def get_company(
     Users can only view their own companies.
     Company is identified by name (which is unique per user).
     """
-    company = db.query(Company).filter(
+    result = await db.execute(select(Company).filter(
         Company.name == company_name,
         Company.user_id == current_user.id
-    ).first()
+    ))
+    company = result.scalars().first()
     
     if not company:
         raise HTTPException(
@@ -151,9 +174,9 @@ def get_company(
     return company
 
 @router.get("/", response_model=List[CompanyResponse])
-def list_companies(
+async def list_companies(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(get_current_user_from_cookie)
@@ -161,15 +184,16 @@ def list_companies(
     """
     List all companies for the current user.
     """
-    companies = db.query(Company).filter(
+    result = await db.execute(select(Company).filter(
         Company.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(limit))
+    companies = result.scalars().all()
     return companies
 
 @router.post("/{company_name}/import-employees", response_model=ImportEmployeesResponse)
 async def import_employees(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     company_name: str,
     current_user: User = Depends(get_current_user_from_cookie)
 ):
@@ -179,10 +203,11 @@ async def import_employees(
     only importing employees that don't already exist.
     """
     # Get the company
-    company = db.query(Company).filter(
+    result = await db.execute(select(Company).filter(
         Company.name == company_name,
         Company.user_id == current_user.id
-    ).first()
+    ))
+    company = result.scalars().first()
     
     if not company:
         raise HTTPException(
@@ -208,7 +233,7 @@ async def import_employees(
 @router.delete("/{company_name}")
 async def delete_company(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     company_name: str,
     current_user: User = Depends(get_current_user_from_cookie)
 ):
@@ -217,10 +242,11 @@ async def delete_company(
     Users can only delete their own companies.
     Company is identified by name (which is unique per user).
     """
-    company = db.query(Company).filter(
+    result = await db.execute(select(Company).filter(
         Company.name == company_name,
         Company.user_id == current_user.id
-    ).first()
+    ))
+    company = result.scalars().first()
     
     if not company:
         raise HTTPException(
@@ -230,14 +256,48 @@ async def delete_company(
     
     try:
         # Delete the company (employees will be automatically deleted due to CASCADE)
-        db.delete(company)
-        db.commit()
+        await db.delete(company)
+        await db.commit()
+        await employee_directory.reload()
+        leave_cache.purge(company.id)
+        token_manager.invalidate(company.id)
         
         return {"message": f"Company '{company_name}' and all its employees have been deleted successfully"}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete company: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.post("/{company_name}/leave-cache/purge")
+async def purge_leave_cache(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    company_name: str,
+    employee_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user_from_cookie)
+):
+    """
+    Drop cached GreytHR leave balances and transactions for a company, or for one of its employees.
+    Users can only purge their own companies.
+    """
+    result = await db.execute(select(Company).filter(
+        Company.name == company_name,
+        Company.user_id == current_user.id
+    ))
+    company = result.scalars().first()
+    
+    if not company:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Company not found or you don't have permission to access it"
+        )
+    
+    if employee_id is not None:
+        purged = leave_cache.invalidate_employee(company.id, employee_id)
+    else:
+        purged = leave_cache.purge(company.id)
+    
+    return {"message": f"Purged {purged} cached leave entries for '{company_name}'", "purged": purged}
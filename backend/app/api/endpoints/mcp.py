@@ -1,18 +1,26 @@
+import os
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List, Literal
+from typing import Dict, Any, Optional, List, Literal, Tuple, AsyncIterator
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 import google.generativeai as genai
 from dotenv import load_dotenv
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from app.database.base import get_db
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.base import AsyncSessionLocal
 from app.models.employee import Employee
-from app.services.greyt_hr import GreytHRLeaveAPI
-from app.core.prompts import get_hr_bot_prompt, LEAVE_POLICY
+from app.services.greyt_hr import leave_api
+from app.core.prompts import get_hr_bot_prompt, LLMPrompt
 from app.core.config import get_settings
+from app.services.slack_client import slack_client
+from app.services.employee_directory import employee_directory, EmployeeRecord
+from app.services.slack_streaming import SlackStreamingReply, streaming_metrics
+from app.services.llm_limiter import llm_limiter, LLMOverloadedError, PRIORITY_INTERACTIVE
+from app.services.llm_backend import build_llm_chain
+from app.services.policy_index import policy_index
 
 # Load environment variables
 load_dotenv()
@@ -27,16 +35,16 @@ logger = logging.getLogger(__name__)
 # Initialize router
 router = APIRouter(prefix="/mcp")
 
+# Stream replies into a placeholder message instead of posting once the LLM is done
+LLM_STREAMING = os.getenv("LLM_STREAMING", "true").lower() in ("1", "true", "yes")
+# Earlier messages added to the user's message when picking policy sections
+POLICY_QUERY_HISTORY = int(os.getenv("POLICY_QUERY_HISTORY", "2"))
+
 # Initialize clients
-slack_client = WebClient(token=settings.SLACK_BOT_TOKEN)
 genai.configure(api_key=settings.GEMINI_API_KEY)
-model = genai.GenerativeModel("gemini-2.0-flash")
-
-# Add new imports and initialize database session
-db = next(get_db())
-
-# Initialize GreytHR leave API
-leave_api = GreytHRLeaveAPI()
+# Ordered backends from LLM_BACKENDS; "fake" runs the whole path with no network.
+# A 429 from a backend the chain falls back from still lowers the concurrency limit.
+llm = build_llm_chain(on_fallback_error=llm_limiter.record_error)
 
 class UserInfo(BaseModel):
     """User information from Slack"""
@@ -74,24 +82,43 @@ class MCPResponse(BaseModel):
     content: Dict[str, Any]
     status: str = "success"
 
-async def get_employee_by_email(email: str) -> Optional[Employee]:
+async def get_employee_by_email(db: AsyncSession, email: str) -> Optional[Employee]:
     """Get employee record from database by email"""    
-    return db.query(Employee).filter_by(email=email).first()
+    result = await db.execute(select(Employee).filter_by(email=email))
+    return result.scalars().first()
+
+async def get_employee_by_slack_id(db: AsyncSession, slack_user_id: str) -> Optional[Employee]:
+    """Get employee record from database by the Slack user matched at sync time"""
+    result = await db.execute(select(Employee).filter_by(slack_user_id=slack_user_id))
+    return result.scalars().first()
+
+async def link_slack_user(db: AsyncSession, employee, slack_user_id: str) -> None:
+    """Persist a Slack user matched by email so later messages skip the email match"""
+    try:
+        await db.execute(
+            update(Employee).where(Employee.id == employee.id).values(slack_user_id=slack_user_id)
+        )
+        await db.commit()
+        if isinstance(employee, EmployeeRecord):
+            employee_directory.link_slack_user(slack_user_id, employee)
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error linking Slack user {slack_user_id}: {str(e)}")
 
-async def get_leave_info(employee: Employee) -> Dict[str, Any]:
+async def get_leave_info(db: AsyncSession, employee: Employee) -> Dict[str, Any]:
     """Get all leave information for an employee"""
     try:
-        print("employee in eave: ", employee)
-        balance_data = await leave_api.get_leave_balance(db, employee)
-        
-        # Get leave transactions for last 30 days
+        # Balance and the last 30 days of transactions are independent, so fetch them together
         end_date = datetime.now().strftime("%Y-%m-%d")
         start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
-        transactions_data = await leave_api.get_leave_transactions(
-            db, 
-            employee,
-            start_date,
-            end_date
+        balance_data, transactions_data = await asyncio.gather(
+            leave_api.get_leave_balance(db, employee),
+            leave_api.get_leave_transactions(
+                db, 
+                employee,
+                start_date,
+                end_date
+            )
         )
         
         return {
@@ -103,61 +130,181 @@ async def get_leave_info(employee: Employee) -> Dict[str, Any]:
         logger.error(f"Error fetching leave info: {str(e)}")
         return None
 
-async def process_with_llm(message: str, context: MessageContext) -> str:
+async def get_leave_context(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve the employee behind a Slack user and fetch their leave information.
+
+    Runs ahead of the LLM call and can be started by the Slack pipeline
+    while it is still gathering channel context. Never raises: a failed
+    lookup comes back with "error" set so the user still gets a reply.
+    """
+    slack_user_id = user.get("id")
+    email = user.get("email")
+    employee = None
+    try:
+        async with AsyncSessionLocal() as db:
+            # Event user -> employee through the mapping built at sync time; the
+            # database only sees employees added since the directory was loaded
+            employee = employee_directory.by_slack_id(slack_user_id)
+            if employee is None and slack_user_id:
+                employee = await get_employee_by_slack_id(db, slack_user_id)
+            # Not matched at sync time (e.g. joined Slack since): match the profile email once
+            if employee is None and email:
+                employee = employee_directory.by_email(email) or await get_employee_by_email(db, email)
+                if employee is not None and slack_user_id:
+                    await link_slack_user(db, employee, slack_user_id)
+            leave_info = await get_leave_info(db, employee) if employee else None
+    except Exception as e:
+        logger.error(f"Error fetching leave context for {slack_user_id}: {str(e)}")
+        return {
+            "email": employee.email if employee else email,
+            "employee": employee,
+            "leave_info": None,
+            "error": str(e)
+        }
+    return {
+        "email": employee.email if employee else email,
+        "employee": employee,
+        "leave_info": leave_info
+    }
+
+LEAVE_FETCH_ERROR_REPLY = "Sorry {name}, I had trouble fetching your leave information. Please try again in a few minutes."
+
+async def build_llm_prompt(
+    message: str,
+    context: MessageContext,
+    leave_context: Optional[Dict[str, Any]] = None
+) -> Tuple[Optional[LLMPrompt], Optional[str]]:
+    """Build the LLM prompt; returns (None, reply) when the user should get a fixed reply instead"""
+    if leave_context is None:
+        leave_context = await get_leave_context(context.user.model_dump())
+    
+    if leave_context.get("error"):
+        return None, LEAVE_FETCH_ERROR_REPLY.format(name=context.user.name)
+
+    if not leave_context["email"]:
+        return None, "Sorry, I couldn't find your email address in Slack. Please make sure your email is set in your Slack profile."
+
+    employee = leave_context["employee"]
+    if not employee:
+        return None, "Sorry, I couldn't find your employee record. Please contact HR to ensure your email is properly set up."
+
+    leave_info = leave_context["leave_info"]
+    if not leave_info:
+        return None, LEAVE_FETCH_ERROR_REPLY.format(name=context.user.name)
+
+    # Format conversation history
+    conversation_history = "\n".join([
+        f"{msg['user']['name']}: {msg['text']}"
+        for msg in context.history
+    ])
+
+    # Prompts carry only the policy sections relevant to the question (and
+    # the last few messages, for follow-ups), with or without the context
+    # cache. Retrieval is deferred until the prompt is sent.
+    recent = " ".join(msg["text"] for msg in context.history[-POLICY_QUERY_HISTORY:]) if POLICY_QUERY_HISTORY else ""
+
+    def leave_policy() -> str:
+        return policy_index.relevant_policy(f"{recent} {message}")
+
+    # Generate prompt using the new function
+    prompt = get_hr_bot_prompt(
+        user_name=context.user.name,
+        channel_type=context.channel.type,
+        conversation_history=conversation_history,
+        user_message=message,
+        leave_info=leave_info,
+        leave_policy=leave_policy
+    )
+    return prompt, None
+
+LLM_BUSY_REPLY = "Sorry, I'm handling a lot of questions right now. Please try again in a minute."
+
+async def process_with_llm(
+    message: str,
+    context: MessageContext,
+    leave_context: Optional[Dict[str, Any]] = None,
+    priority: int = PRIORITY_INTERACTIVE
+) -> str:
     """Process message with LLM using full context"""
     try:
-        # Get user's email from context
-        email = "manoj@webgility.com"
-        if not email:
-            return "Sorry, I couldn't find your email address in Slack. Please make sure your email is set in your Slack profile."
-
-        # Get employee record from database
-        employee = await get_employee_by_email(email)
-        if not employee:
-            return "Sorry, I couldn't find your employee record. Please contact HR to ensure your email is properly set up."
-
-        # Get leave information
-        leave_info = await get_leave_info(employee)
-        if not leave_info:
-            return f"Sorry {context.user.name}, I had trouble fetching your leave information. Please try again in a few minutes."
-
-        # Format conversation history
-        conversation_history = "\n".join([
-            f"{msg['user']['name']}: {msg['text']}"
-            for msg in context.history
-        ])
-
-        # Generate prompt using the new function
-        prompt = get_hr_bot_prompt(
-            user_name=context.user.name,
-            channel_type=context.channel.type,
-            conversation_history=conversation_history,
-            user_message=message,
-            leave_info=leave_info,
-            leave_policy=LEAVE_POLICY
-        )
+        prompt, reply = await build_llm_prompt(message, context, leave_context)
+        if reply is not None:
+            return reply
 
-        # Use LLM to generate response
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        # Async API, so the event loop keeps serving while the model works; the
+        # adaptive limiter caps how many calls are out at once
+        async with llm_limiter.slot(priority):
+            response_text = await llm.generate(prompt)
+        return response_text.strip()
         
+    except LLMOverloadedError as e:
+        logger.warning(f"LLM call rejected: {str(e)}")
+        return LLM_BUSY_REPLY
     except Exception as e:
         logger.error(f"Error processing with LLM: {str(e)}")
         return f"Sorry {context.user.name}, I encountered an error: {str(e)}"
 
-@router.post("/on_tagged_in_channel")
-async def handle_channel_mention(request: MCPRequest) -> MCPResponse:
-    """Handle when bot is mentioned in a channel"""
+async def stream_with_llm(
+    message: str,
+    context: MessageContext,
+    leave_context: Optional[Dict[str, Any]] = None,
+    priority: int = PRIORITY_INTERACTIVE
+) -> AsyncIterator[str]:
+    """Yield the reply text piece by piece as the model streams it"""
+    prompt, reply = await build_llm_prompt(message, context, leave_context)
+    if reply is not None:
+        yield reply
+        return
+
+    # The slot is held until the stream is drained; time to first chunk feeds the limiter
+    async with llm_limiter.slot(priority) as call:
+        async for text in llm.stream(prompt):
+            call.first_response()
+            yield text
+
+async def send_reply(request: MCPRequest, leave_context: Optional[Dict[str, Any]] = None) -> str:
+    """Answer in Slack; with LLM_STREAMING the reply is written into a placeholder as it streams"""
+    channel = request.context.channel.id
+    thread_ts = request.context.thread_ts
+
+    if not LLM_STREAMING:
+        response_text = await process_with_llm(request.message, request.context, leave_context)
+        await slack_client.chat_postMessage(
+            channel=channel,
+            text=response_text,
+            thread_ts=thread_ts
+        )
+        return response_text
+
+    # The placeholder goes out before the LLM call. The Slack pipeline has
+    # usually prefetched the leave context by now; only callers that pass
+    # none have the leave lookup run after the placeholder.
+    reply = SlackStreamingReply(slack_client, channel, thread_ts)
+    await reply.start()
+    response_text = ""
     try:
-        response_text = await process_with_llm(request.message, request.context)
-        
-        # Send response back to Slack
+        async for text in stream_with_llm(request.message, request.context, leave_context):
+            response_text += text
+            reply.update(response_text)
+        response_text = response_text.strip() or "Sorry, I couldn't come up with an answer. Please try rephrasing."
+    except LLMOverloadedError as e:
+        logger.warning(f"LLM call rejected: {str(e)}")
+        response_text = LLM_BUSY_REPLY
+    except Exception as e:
+        logger.error(f"Error processing with LLM: {str(e)}")
+        response_text = f"Sorry {request.context.user.name}, I encountered an error: {str(e)}"
+    await reply.finish(response_text)
+    return response_text
+
+async def answer_channel_mention(
+    request: MCPRequest,
+    leave_context: Optional[Dict[str, Any]] = None
+) -> MCPResponse:
+    """Answer a channel mention, reusing leave context prefetched by the caller if given"""
+    try:
+        # Generate the reply and send it back to Slack
         try:
-            slack_client.chat_postMessage(
-                channel=request.context.channel.id,
-                text=response_text,
-                thread_ts=request.context.thread_ts
-            )
+            response_text = await send_reply(request, leave_context)
             
             return MCPResponse(
                 type="on_tagged_in_channel_response",
@@ -171,20 +318,20 @@ async def handle_channel_mention(request: MCPRequest) -> MCPResponse:
         logger.error(f"Channel mention error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/on_dm_personally")
-async def handle_direct_message(request: MCPRequest) -> MCPResponse:
-    """Handle direct messages to the bot"""
+async def answer_direct_message(
+    request: MCPRequest,
+    leave_context: Optional[Dict[str, Any]] = None
+) -> MCPResponse:
+    """Answer a direct message, reusing leave context prefetched by the caller if given"""
     try:
-        print("I AM REQUEST: ", request)
-        response_text = await process_with_llm(request.message, request.context)
+        logger.debug(
+            f"Direct message - channel: {request.context.channel.id}, user: {request.context.user.id}, "
+            f"history: {len(request.context.history)} messages"
+        )
         
-        # Send response back to Slack
+        # Generate the reply and send it back to Slack
         try:
-            slack_client.chat_postMessage(
-                channel=request.context.channel.id,
-                text=response_text,
-                thread_ts=request.context.thread_ts
-            )
+            response_text = await send_reply(request, leave_context)
         except SlackApiError as e:
             logger.error(f"Slack API error: {str(e)}")
             raise HTTPException(status_code=500, detail="Error sending message to Slack")
@@ -197,10 +344,35 @@ async def handle_direct_message(request: MCPRequest) -> MCPResponse:
         logger.error(f"DM error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/on_tagged_in_channel")
+async def handle_channel_mention(request: MCPRequest) -> MCPResponse:
+    """Handle when bot is mentioned in a channel"""
+    return await answer_channel_mention(request)
+
+@router.post("/on_dm_personally")
+async def handle_direct_message(request: MCPRequest) -> MCPResponse:
+    """Handle direct messages to the bot"""
+    return await answer_direct_message(request)
+
 @router.post("/health")
 async def health_check() -> MCPResponse:
     """Health check endpoint"""
     return MCPResponse(
         type="health_check",
         content={"status": "healthy"}
-    ) 
\ No newline at end of file
+    )
+
+@router.get("/greythr/stats")
+async def greythr_stats() -> Dict[str, Any]:
+    """Per-tenant GreytHR resilience metrics"""
+    return leave_api.stats()
+
+@router.get("/llm/stats")
+async def llm_stats() -> Dict[str, Any]:
+    """Streaming reply metrics (time to first visible token), LLM concurrency, backend fallbacks and policy retrieval"""
+    return {
+        "streaming": streaming_metrics.stats(),
+        "limiter": llm_limiter.stats(),
+        "backends": llm.stats(),
+        "policy": policy_index.stats()
+    }
@@ -1,20 +1,28 @@
-import os
 import logging
-import aiohttp
-from typing import Dict, Any, Literal, List, Set
-from fastapi import APIRouter, HTTPException, Response
+from collections import deque
+from typing import Dict, Any, Literal, List
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 import re
-from datetime import datetime, timedelta
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+from app.services.event_dedup import event_dedup_store
+from app.services.slack_client import slack_client
+from app.services.mcp_dispatch import mcp_dispatcher
+from app.services.pipeline import StagePipeline
+from app.services.slack_user_cache import SlackUserCache, unknown_user_info
+from app.services.conversation_window import ConversationWindowCache
+from app.services.employee_directory import employee_directory
+from app.services.leave_cache import leave_cache
+from app.services.greyt_hr_tokens import token_manager
+from app.services.slack_event_queue import SlackEventWorkerPool, SLACK_EVENT_ACK_FIRST
 
 USER_RE = re.compile(r"<@([A-Z0-9]+)(\|[^>]+)?>")
 
-# Add a set to track processed events
-processed_events: Set[str] = set()
-
 def get_event_key(event: Dict[str, Any]) -> str:
     """Create a unique event key using timestamp and user ID"""
     event_ts = event.get("event_ts")
@@ -26,44 +34,14 @@ def get_event_key(event: Dict[str, Any]) -> str:
         
     # Create a unique key using event type, timestamp, and user ID
     return f"{event_type}_{event_ts}_{user_id}"
-
-def cleanup_old_events():
-    """Clean up events older than 5 minutes"""
-    current_time = datetime.now()
-    global processed_events
-    
-    # Filter out old events
-    processed_events = {
-        event_key for event_key in processed_events 
-        if current_time - datetime.fromtimestamp(float(event_key.split('_')[1])) < timedelta(minutes=5)
-    }
     
-def lookup_username(uid: str) -> str:
-    """Get username from user ID using users_info API"""
-    try:
-        info = slack_client.users_info(user=uid)
-        if not info["ok"]:
-            raise SlackApiError("Failed to get user info", info)
-            
-        user = info["user"]
-        # Try different name fields in order of preference
-        return (
-            user.get("profile", {}).get("display_name")
-            or user.get("profile", {}).get("real_name")
-            or user.get("real_name")
-            or user.get("name")
-            or f"User_{uid[-4:]}"
-        )
-    except SlackApiError as e:
-        logger.error(f"Error looking up username: {str(e)}")
-        return f"User_{uid[-4:]}"
+def render_mentions(txt: str, users: Dict[str, Dict[str, Any]]) -> str:
+    """Replace <@U..> mentions with @name using already-resolved users"""
+    return USER_RE.sub(lambda m: f"@{(users.get(m.group(1)) or unknown_user_info(m.group(1)))['name']}", txt)
 
-def replace_mentions(txt: str) -> str:
-    return USER_RE.sub(lambda m: f"@{lookup_username(m.group(1))}", txt)
-
-def resolve_channel_name(cid: str) -> str:
+async def resolve_channel_name(cid: str) -> str:
     try:
-        info = slack_client.conversations_info(channel=cid)
+        info = await slack_client.conversations_info(channel=cid)
         return info["channel"].get("name") or cid
     except SlackApiError:
         return cid
@@ -77,72 +55,150 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/slack")
 
-# Initialize Slack client
-slack_client = WebClient(token=os.getenv("SLACK_BOT_TOKEN"))
+# Shared Slack user profile cache
+user_cache = SlackUserCache(slack_client)
+
+# Bot identity from auth_test, resolved once at startup
+bot_identity: Dict[str, Any] = None
+
+# DM channel id -> the (non-bot) user it belongs to
+dm_channel_users: Dict[str, str] = {}
+
+# Per-channel/thread windows of enriched messages
+conversation_windows = ConversationWindowCache()
 
-MCP_SERVER_URL = "http://localhost:8000/api/v1/mcp"
+# Page size when walking a thread's replies to reach its newest messages
+THREAD_REPLIES_PAGE_SIZE = 200
 
 ALLOWED_EVENT_TYPES = Literal["app_mention", "message"]
 
+# Message subtypes that change existing messages rather than add one
+MESSAGE_UPDATE_SUBTYPES = ("message_changed", "message_deleted")
+
+# Non-message event types the bot acts on
+RELEVANT_EVENT_TYPES = ("app_mention", "user_change", "team_join")
+
 async def get_user_info(user_id: str) -> Dict[str, Any]:
     """Get comprehensive user info from Slack including email"""
-    try:
-        user_info = slack_client.users_info(user=user_id)
-        if not user_info["ok"]:
-            raise SlackApiError("Failed to get user info", user_info)
-            
-        user = user_info["user"]
-        profile = user.get("profile", {})
-        
-        return {
-            "id": user_id,
-            "name": (
-                profile.get("display_name")
-                or profile.get("real_name")
-                or user.get("real_name")
-                or user.get("name")
-                or f"User_{user_id[-4:]}"
-            ),
-            "email": profile.get("email"),
-            "is_bot": user.get("is_bot", False),
-            "team_id": user.get("team_id"),
-            "real_name": profile.get("real_name"),
-            "display_name": profile.get("display_name")
-        }
-    except SlackApiError as e:
-        logger.error(f"Error getting user info: {str(e)}")
-        return {
-            "id": user_id,
-            "name": f"User_{user_id[-4:]}",
-            "email": None,
-            "is_bot": False
+    return await user_cache.get_user(user_id)
+
+async def enrich_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Attach user info to raw Slack messages and resolve their mentions.
+
+    Senders and mentioned users across all messages are resolved in one
+    pass, so each distinct user is looked up once and misses are fetched
+    concurrently.
+    """
+    user_ids = set()
+    for m in messages:
+        user_ids.add(m.get("user", ""))
+        user_ids.update(match.group(1) for match in USER_RE.finditer(m["text"]))
+    users = await user_cache.get_users(user_ids)
+    
+    return [
+        {
+            "user": users.get(m.get("user", "")) or unknown_user_info(m.get("user", "")),
+            "text": render_mentions(m["text"], users),
+            "ts": m.get("ts"),
+            "thread_ts": m.get("thread_ts")
         }
+        for m in messages
+    ]
+
+async def enrich_message(m: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach user info to a single raw Slack message"""
+    return (await enrich_messages([m]))[0]
+
+async def get_latest_thread_replies(cid: str, thread_ts: str, limit: int) -> List[Dict[str, Any]]:
+    """The newest `limit` messages of a thread, newest first.
+
+    conversations.replies returns a thread oldest first, so its first page
+    is the start of the thread; the pages are walked with the cursor and
+    only the last `limit` messages kept.
+    """
+    latest: deque = deque(maxlen=limit)
+    cursor = None
+    while True:
+        result = await slack_client.conversations_replies(
+            channel=cid,
+            ts=thread_ts,
+            limit=THREAD_REPLIES_PAGE_SIZE,
+            cursor=cursor
+        )
+        latest.extend(result["messages"])
+        cursor = (result.get("response_metadata") or {}).get("next_cursor")
+        if not result.get("has_more") or not cursor:
+            break
+    # Windows are newest first like conversations_history
+    return list(reversed(latest))
 
-async def get_channel_history(cid: str, limit: int = 10) -> List[Dict[str, Any]]:
-    """Get channel history with user info for each message"""
+async def get_channel_history(cid: str, limit: int = 10, thread_ts: str = None) -> List[Dict[str, Any]]:
+    """Get channel (or thread) history with user info for each message"""
+    cached = conversation_windows.get(cid, thread_ts, limit)
+    if cached is not None:
+        return cached
+    
     try:
-        result = slack_client.conversations_history(channel=cid, limit=limit)
+        if thread_ts:
+            messages = await get_latest_thread_replies(cid, thread_ts, limit)
+        else:
+            result = await slack_client.conversations_history(channel=cid, limit=limit)
+            messages = result["messages"]
     except SlackApiError as e:
         logger.error("history fetch failed: %s", e)
         return []
 
-    out = []
-    for m in result["messages"]:
-        if m.get("bot_id") or not m.get("text"):
-            continue
-            
-        # Get user info for each message
-        user_info = await get_user_info(m.get("user", ""))
-        text = replace_mentions(m["text"])
-        
-        out.append({
-            "user": user_info,
-            "text": text,
-            "ts": m.get("ts"),
-            "thread_ts": m.get("thread_ts")
-        })
+    out = await enrich_messages([
+        m for m in messages
+        if not m.get("bot_id") and m.get("text")
+    ])
+    
+    conversation_windows.put(cid, thread_ts, out)
     return out
 
+async def record_message_event(slack_event: Dict[str, Any]) -> None:
+    """Keep warm conversation windows current from incoming message events"""
+    cid = slack_event.get("channel")
+    subtype = slack_event.get("subtype")
+    
+    if subtype in MESSAGE_UPDATE_SUBTYPES:
+        # Bot messages never enter a window, so their edits (every streamed reply) change nothing
+        if is_bot_message_update(slack_event):
+            return
+        # Other edits and deletes are rare; drop the windows that could hold the
+        # message and let the next fetch rebuild them
+        changed = slack_event.get("message") or slack_event.get("previous_message") or {}
+        ts = changed.get("ts") or slack_event.get("deleted_ts")
+        thread_ts = changed.get("thread_ts")
+        in_thread = thread_ts and thread_ts != ts
+        if (not in_thread or changed.get("subtype") == "thread_broadcast") \
+                and conversation_windows.may_contain(cid, None, ts):
+            conversation_windows.drop(cid)
+        if thread_ts and conversation_windows.may_contain(cid, thread_ts, ts):
+            conversation_windows.drop(cid, thread_ts)
+        return
+    
+    if slack_event.get("bot_id") or not slack_event.get("text"):
+        return
+    
+    ts = slack_event.get("ts")
+    thread_ts = slack_event.get("thread_ts")
+    in_thread = thread_ts and thread_ts != ts
+    
+    # Only warm windows are updated, so skip the enrichment when neither is cached
+    targets = []
+    if in_thread:
+        targets.append(thread_ts)
+    if not in_thread or subtype == "thread_broadcast":
+        targets.append(None)
+    targets = [t for t in targets if conversation_windows.has(cid, t)]
+    if not targets:
+        return
+    
+    message = await enrich_message(slack_event)
+    for target in targets:
+        conversation_windows.append(cid, target, message)
+
 class SlackEvent(BaseModel):
     """Slack event model"""
     type: str
@@ -152,28 +208,22 @@ class SlackEvent(BaseModel):
     event_id: str = None
     event_time: int = None
 
-    def is_duplicate_event(self) -> bool:
+    async def is_duplicate_event(self) -> bool:
         """Check if this is a duplicate event we should ignore"""
         if not self.event:
             return False
             
-        # Create a unique event identifier using type, timestamp, and user
-        event_key = get_event_key(self.event)
+        # Slack's event_id is unique per event; fall back to type/ts/user for payloads without one
+        event_key = self.event_id or get_event_key(self.event)
         if not event_key:
             logger.warning("Could not create event key - missing required fields")
             return False
-            
-        # Clean up old events periodically
-        cleanup_old_events()
         
-        # Check if we've seen this exact event before
-        if event_key in processed_events:
-            logger.info(f"Ignoring duplicate event - type: {self.event.get('type')}, ts: {self.event.get('event_ts')}, user: {self.event.get('user')}")
+        if await event_dedup_store.is_duplicate(event_key):
+            logger.info(f"Ignoring duplicate event - id: {event_key}, type: {self.event.get('type')}")
             return True
             
-        # Add this event to processed events
-        processed_events.add(event_key)
-        logger.info(f"New event - type: {self.event.get('type')}, ts: {self.event.get('event_ts')}, user: {self.event.get('user')}")
+        logger.info(f"New event - id: {event_key}, type: {self.event.get('type')}, user: {self.event.get('user')}")
         return False
 
     def is_allowed_event(self) -> bool:
@@ -189,71 +239,269 @@ class SlackEvent(BaseModel):
         # Log the full event for debugging
         logger.info(f"Event details - type: {inner_type}, subtype: {inner.get('subtype')}, channel_type: {inner.get('channel_type')}, event_ts: {inner.get('event_ts')}")
         
-        # Filter out message subtypes (like message_changed, message_received)
+        # Every non-bot message keeps the conversation windows current;
+        # only direct messages get a reply (see process_slack_event)
         if inner_type == "message":
-            # Only process direct messages that are not from bots
-            return (inner.get("channel_type") == "im" and 
-                   not inner.get("bot_id"))
+            return not inner.get("bot_id") and not is_bot_message_update(inner)
+
+        # Profile updates keep the user cache fresh
+        if inner_type in ("user_change", "team_join"):
+            return True
 
         return inner_type == "app_mention"
 
-async def forward_to_mcp(endpoint: str, body: dict) -> dict:
-    """Forward event to MCP server using async HTTP"""
-    async with aiohttp.ClientSession() as session:
-        r = await session.post(f"{MCP_SERVER_URL}/{endpoint}", json=body)
-        r.raise_for_status()
-        return await r.json()
+def is_bot_message_update(inner: Dict[str, Any]) -> bool:
+    """An edit or delete of a bot's message; Slack puts the bot marker in the nested message"""
+    if inner.get("subtype") not in MESSAGE_UPDATE_SUBTYPES:
+        return False
+    bot_user_id = bot_identity.get("user_id") if bot_identity else None
+    for changed in (inner.get("message"), inner.get("previous_message")):
+        if not changed:
+            continue
+        if changed.get("bot_id") or changed.get("subtype") == "bot_message":
+            return True
+        if bot_user_id and changed.get("user") == bot_user_id:
+            return True
+    return False
+
+def is_irrelevant_event(payload: Dict[str, Any]) -> bool:
+    """Cheap check on the raw payload for events we would discard anyway.
+
+    Runs before model validation, dedup and logging, so the bot messages,
+    edits and chatter in channels we hold no window for (the bulk of
+    traffic) cost one dict lookup or two. Anything it lets through is still
+    checked by SlackEvent.is_allowed_event.
 
-def get_other_user_in_dm(channel_id: str) -> str:
+    Channel relevance is judged against this process's windows. A message
+    dropped because another worker holds the window only costs that window
+    an update, and windows expire after SLACK_HISTORY_MAX_AGE, so the next
+    cold fetch picks it up.
+    """
+    if payload.get("type") != "event_callback":
+        return False
+    
+    inner = payload.get("event")
+    if not isinstance(inner, dict):
+        return True
+    
+    inner_type = inner.get("type")
+    if inner_type != "message":
+        return inner_type not in RELEVANT_EVENT_TYPES
+    
+    if inner.get("bot_id") or inner.get("subtype") == "bot_message":
+        return True
+    # Including the chat.update edits of every streamed reply
+    if is_bot_message_update(inner):
+        return True
+    if inner.get("channel_type") == "im":
+        return False
+    
+    # Channel messages only matter if they update a window we already hold
+    channel = inner.get("channel")
+    if inner.get("subtype") in MESSAGE_UPDATE_SUBTYPES:
+        changed = inner.get("message") or inner.get("previous_message") or {}
+        return not (
+            conversation_windows.has(channel)
+            or conversation_windows.has(channel, changed.get("thread_ts"))
+        )
+    thread_ts = inner.get("thread_ts")
+    if thread_ts and thread_ts != inner.get("ts"):
+        return not (
+            conversation_windows.has(channel, thread_ts)
+            or (inner.get("subtype") == "thread_broadcast" and conversation_windows.has(channel))
+        )
+    return not conversation_windows.has(channel)
+
+async def forward_to_mcp(endpoint: str, body: dict, leave_context: Dict[str, Any] = None) -> dict:
+    """Forward event to the MCP handlers (in-process, or over HTTP when MCP_SERVER_URL is set)"""
+    return await mcp_dispatcher.dispatch(endpoint, body, leave_context)
+
+def build_mcp_payload(
+    message: str,
+    channel: Dict[str, Any],
+    user_info: Dict[str, Any],
+    history: List[Dict[str, Any]],
+    event_type: str,
+    slack_event: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Build the MCP request body for a Slack event"""
+    return {
+        "message": message,
+        "context": {
+            "channel": channel,
+            "user": user_info,
+            "history": history,
+            "event_type": event_type,
+            "event_ts": slack_event.get("event_ts"),
+            "thread_ts": slack_event.get("thread_ts")
+        }
+    }
+
+async def resolve_bot_identity() -> Dict[str, Any]:
+    """Resolve the bot's own user id once via auth_test and cache it for the process"""
+    global bot_identity
+    if bot_identity is None:
+        try:
+            auth = await slack_client.auth_test()
+            bot_identity = {
+                "user_id": auth.get("user_id"),
+                "bot_id": auth.get("bot_id"),
+                "team_id": auth.get("team_id")
+            }
+            logger.info(f"Resolved bot identity: {bot_identity['user_id']}")
+        except SlackApiError as e:
+            logger.error(f"Error resolving bot identity: {str(e)}")
+            return {}
+    return bot_identity
+
+async def get_other_user_in_dm(channel_id: str, event_user: str = None) -> str:
     """Get the ID of the other user in a DM conversation (not the bot)"""
+    bot_user_id = (await resolve_bot_identity()).get("user_id")
+    
+    # The message event already names its sender
+    if event_user and event_user != bot_user_id:
+        dm_channel_users[channel_id] = event_user
+        return event_user
+    
+    # An IM channel always belongs to the same user, so it never needs re-resolving
+    if channel_id in dm_channel_users:
+        return dm_channel_users[channel_id]
+    
     try:
-        # Get conversation info with members
-        conv_info = slack_client.conversations_info(
-            channel=channel_id,
-            include_num_members=True
-        )
+        # For IM channels conversations_info carries the other user's id directly
+        conv_info = await slack_client.conversations_info(channel=channel_id)
         if not conv_info["ok"]:
             raise SlackApiError("Failed to get conversation info", conv_info)
-            
-        # Get the bot's user ID
-        bot_info = slack_client.auth_test()
-        bot_id = bot_info["user_id"]
-        
-        # Get members of the conversation
-        members_response = slack_client.conversations_members(channel=channel_id)
-        if not members_response["ok"]:
-            raise SlackApiError("Failed to get conversation members", members_response)
-            
-        members = members_response["members"]
         
-        # First find the other user's ID (not the bot)
-        other_user_id = None
-        for user_id in members:
-            if user_id != bot_id:
-                other_user_id = user_id
-                break
-                
-        if not other_user_id:
+        other_user_id = conv_info["channel"].get("user")
+        if not other_user_id or other_user_id == bot_user_id:
             raise SlackApiError("Could not find other user in DM", conv_info)
-            
-        # Verify this is not the bot by getting user info
-        user_info = slack_client.users_info(user=other_user_id)
-        if not user_info["ok"]:
-            raise SlackApiError("Failed to get user info", user_info)
-            
-        # Double check this is not a bot
-        if user_info["user"].get("is_bot"):
-            raise SlackApiError("Found user is a bot", user_info)
-            
+        
+        dm_channel_users[channel_id] = other_user_id
         return other_user_id
         
     except SlackApiError as e:
         logger.error(f"Error getting other user in DM: {str(e)}")
         raise
 
+async def handle_app_mention(slack_event: Dict[str, Any]) -> None:
+    """Answer an app mention.
+
+    Sender lookup, history and channel name are gathered concurrently, and
+    the employee/leave fetch starts as soon as the sender is known, so the
+    LLM call is only waiting on the slowest of them.
+    """
+    # Extract message from the text, removing the mention
+    raw = slack_event["text"]
+    cleaned_msg = USER_RE.sub("", raw, count=1).strip()
+    cid = slack_event["channel"]
+    thread_ts = slack_event.get("thread_ts")
+    
+    pipeline = StagePipeline("app_mention")
+    pipeline.stage("sender", lambda r: get_user_info(slack_event["user"]))
+    pipeline.stage("history", lambda r: get_channel_history(cid, thread_ts=thread_ts))
+    pipeline.stage("channel", lambda r: resolve_channel_name(cid))
+    pipeline.stage("leave", lambda r: mcp_dispatcher.prefetch_leave_context(r["sender"]), deps=["sender"])
+    pipeline.stage(
+        "reply",
+        lambda r: forward_to_mcp(
+            "on_tagged_in_channel",
+            build_mcp_payload(
+                cleaned_msg,
+                {"id": cid, "name": r["channel"], "type": "channel"},
+                r["sender"],
+                r["history"],
+                "app_mention",
+                slack_event
+            ),
+            r["leave"]
+        ),
+        deps=["sender", "history", "channel", "leave"]
+    )
+    await pipeline.run()
+
+async def get_dm_sender_info(slack_event: Dict[str, Any]) -> Dict[str, Any]:
+    """Get comprehensive user info for the person messaging the bot"""
+    sender_id = await get_other_user_in_dm(slack_event["channel"], slack_event.get("user"))
+    return await get_user_info(sender_id)
+
+async def handle_direct_message(slack_event: Dict[str, Any]) -> None:
+    """Answer a direct message, overlapping history and leave lookups like handle_app_mention"""
+    cid = slack_event["channel"]
+    thread_ts = slack_event.get("thread_ts")
+    
+    pipeline = StagePipeline("direct_message")
+    pipeline.stage("sender", lambda r: get_dm_sender_info(slack_event))
+    pipeline.stage("history", lambda r: get_channel_history(cid, thread_ts=thread_ts))
+    pipeline.stage("leave", lambda r: mcp_dispatcher.prefetch_leave_context(r["sender"]), deps=["sender"])
+    pipeline.stage(
+        "reply",
+        lambda r: forward_to_mcp(
+            "on_dm_personally",
+            build_mcp_payload(
+                slack_event["text"],
+                {"id": cid, "name": "Direct Message", "type": "dm"},
+                r["sender"],
+                r["history"],
+                "direct_message",
+                slack_event
+            ),
+            r["leave"]
+        ),
+        deps=["sender", "history", "leave"]
+    )
+    await pipeline.run()
+
+async def process_slack_event(slack_event: Dict[str, Any]) -> None:
+    """Run the full pipeline for an allowed Slack event (lookups, MCP, LLM, reply)"""
+    event_type = slack_event.get("type")
+    
+    if event_type in ("user_change", "team_join"):
+        user_cache.update_from_event(slack_event.get("user") or {})
+    
+    elif event_type == "app_mention":
+        try:
+            await handle_app_mention(slack_event)
+        except Exception as e:
+            logger.error(f"Error processing channel mention: {str(e)}")                
+            raise
+        
+    elif event_type == "message":
+        await record_message_event(slack_event)
+        
+        # Only direct messages get a reply
+        if slack_event.get("channel_type") == "im" and slack_event.get("subtype") not in MESSAGE_UPDATE_SUBTYPES:
+            logger.info("Processing direct message event")
+            try:
+                await handle_direct_message(slack_event)
+            except Exception as e:
+                logger.error(f"Error processing direct message: {str(e)}")
+                raise
+
+# Background workers that drain events acknowledged in ack-first mode
+event_pool = SlackEventWorkerPool(process_slack_event)
+
 @router.post("/events")
-async def handle_slack_events(event: SlackEvent, response: Response):
+async def handle_slack_events(request: Request, response: Response):
     try:        
+        try:
+            payload = json_loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        
+        # Slack retries after a timeout even though the first delivery reached us
+        # and is already being processed, so ack those without any further work
+        retry_num = request.headers.get("X-Slack-Retry-Num")
+        if retry_num and request.headers.get("X-Slack-Retry-Reason") == "http_timeout":
+            logger.debug(f"Ignoring Slack retry {retry_num} for event {payload.get('event_id')} (http_timeout)")
+            return {"status": "ok", "detail": "Retry ignored"}
+        
+        # Fast path: drop irrelevant events before any model construction or logging
+        if is_irrelevant_event(payload):
+            return {"status": "ok", "detail": "Event ignored"}
+        
+        event = SlackEvent.model_validate(payload)
+        
         # Handle URL verification
         if event.type == "url_verification":
             logger.info("Handling URL verification request")
@@ -262,7 +510,7 @@ async def handle_slack_events(event: SlackEvent, response: Response):
                 raise HTTPException(status_code=400, detail="Missing challenge parameter")
             return {"challenge": event.challenge}
         
-        if event.is_duplicate_event():
+        if await event.is_duplicate_event():
             response.status_code = 200
             return {"status": "ok", "detail": "Duplicate event ignored"}
         
@@ -275,89 +523,37 @@ async def handle_slack_events(event: SlackEvent, response: Response):
         # Acknowledge the event immediately
         response.status_code = 200
         
-        # Handle events
-        slack_event = event.event
-        event_type = slack_event.get("type")
+        # In ack-first mode the workers process the event after we return;
+        # if the queue is full we fall back to processing inline so nothing is dropped
+        if SLACK_EVENT_ACK_FIRST and event_pool.enqueue(event.event):
+            return {"status": "ok", "detail": "Event queued"}
         
-        if event_type == "app_mention":
-            try:
-                # Get user info for the person who mentioned the bot
-                user_info = await get_user_info(slack_event["user"])
-                
-                # Extract message from the text, removing the mention
-                raw = slack_event["text"]
-                cleaned_msg = USER_RE.sub("", raw, count=1).strip()
-                cid = slack_event["channel"]
-                
-                # Get channel history with user info
-                history = await get_channel_history(cid)
-                
-                # Get channel info
-                channel_info = slack_client.conversations_info(channel=cid)
-                channel_name = channel_info["channel"].get("name") if channel_info["ok"] else cid
-
-                payload = {
-                    "message": cleaned_msg,
-                    "context": {
-                        "channel": {
-                            "id": cid,
-                            "name": channel_name,
-                            "type": "channel"
-                        },
-                        "user": user_info,
-                        "history": history,
-                        "event_type": "app_mention",
-                        "event_ts": slack_event.get("event_ts"),
-                        "thread_ts": slack_event.get("thread_ts")
-                    }
-                }
-                
-                # Forward to MCP server
-                await forward_to_mcp("on_tagged_in_channel", payload)
-                
-            except Exception as e:
-                logger.error(f"Error processing channel mention: {str(e)}")                
-                raise
-            
-        elif event_type == "message" and slack_event.get("channel_type") == "im":
-            logger.info("Processing direct message event")
-            try:
-                # Get the ID of the person messaging the bot
-                sender_id = get_other_user_in_dm(slack_event["channel"])
-                
-                # Get comprehensive user info
-                user_info = await get_user_info(sender_id)
-                
-                # Get message history for the DM channel
-                cid = slack_event["channel"]
-                history = await get_channel_history(cid)
-                
-                payload = {
-                    "message": slack_event["text"],
-                    "context": {
-                        "channel": {
-                            "id": cid,
-                            "name": "Direct Message",
-                            "type": "dm"
-                        },
-                        "user": user_info,
-                        "history": history,
-                        "event_type": "direct_message",
-                        "event_ts": slack_event.get("event_ts"),
-                        "thread_ts": slack_event.get("thread_ts")
-                    }
-                }
-                
-                # Process the event asynchronously
-                await forward_to_mcp("on_dm_personally", payload)
-                
-            except Exception as e:
-                logger.error(f"Error processing direct message: {str(e)}")
-                raise HTTPException(status_code=500, detail=str(e))
+        await process_slack_event(event.event)
         
         return {"status": "ok"}
         
     except Exception as e:
         logger.error(f"Error handling Slack event: {str(e)}")
         response.status_code = 200
-        return {"status": "error", "detail": str(e)} 
\ No newline at end of file
+        return {"status": "error", "detail": str(e)}
+
+@router.get("/queue/stats")
+async def get_queue_stats() -> Dict[str, Any]:
+    """Queue depth and worker utilization of the Slack event workers"""
+    return event_pool.stats()
+
+@router.get("/rate-limits/stats")
+async def get_rate_limit_stats() -> Dict[str, Any]:
+    """Throttle waits and 429 retries per Slack Web API method"""
+    return slack_client.stats()
+
+@router.get("/cache/stats")
+async def get_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the Slack user profile, conversation, employee and leave caches"""
+    return {
+        "users": user_cache.stats(),
+        "conversations": conversation_windows.stats(),
+        "employees": employee_directory.stats(),
+        "leave": leave_cache.stats(),
+        "greythr_tokens": token_manager.stats()
+    }
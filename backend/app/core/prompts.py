@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Union
 import json
 
 # Leave Policy
@@ -173,42 +173,9 @@ def format_leave_info(leave_info: Dict[str, Any]) -> Dict[str, Any]:
         "Last Updated": leave_info["last_updated"]
     }
 
-def get_hr_bot_prompt(
-    user_name: str,
-    channel_type: str,
-    conversation_history: str,
-    user_message: str,
-    leave_info: Dict[str, Any],
-    leave_policy: str = LEAVE_POLICY
-) -> str:
-    """
-    Generate the prompt for the HR bot with context about leave information and policy.
-    
-    Args:
-        user_name: Name of the user asking the question
-        channel_type: Type of channel (dm/channel)
-        conversation_history: Previous conversation messages
-        user_message: Current message from the user
-        leave_info: Dictionary containing leave balance and transactions
-        leave_policy: Company leave policy text (defaults to LEAVE_POLICY)
-    """
-    
-    # Format leave information
-    leave_context = format_leave_info(leave_info)
-
-    return f"""You are a helpful HR assistant named HRbot. You're talking to {user_name} in a {channel_type} channel.
-
-Previous conversation:
-{conversation_history}
-
-Current message from {user_name}:
-{user_message}
-
-Available Leave Information:
-{json.dumps(leave_context, indent=2)}
-
-Company Leave Policy:
-{leave_policy}
+# Static part of every HR bot prompt. It comes first and is built once, so
+# providers can cache it as a prefix; everything per request follows it.
+HR_BOT_INSTRUCTIONS = """You are a helpful HR assistant named HRbot, answering employees' questions in Slack.
 
 Instructions:
 1. Focus primarily on answering the user's specific question. The leave information and policy are context to help you provide accurate answers.
@@ -242,5 +209,80 @@ Instructions:
    - Explain the application process
    - Mention advance notice requirements
    - Highlight any restrictions or conditions
+"""
+
+HR_BOT_PREFIX = f"""{HR_BOT_INSTRUCTIONS}
+Leave Policy Summary:
+{json.dumps(LEAVE_POLICY_SUMMARY, indent=2)}
+"""
+
+class LLMPrompt:
+    """An HR bot prompt split into the shared static prefix and a per-request part.
+
+    `dynamic` holds the policy sections picked for this question followed
+    by the per-request suffix. A backend with a context cache registers
+    `cache_prefix` once and sends only `dynamic`; anything else sends
+    `text`, which is the same prefix followed by the same dynamic part, so
+    the model sees identical content either way. `policy` may be a
+    callable, so section retrieval only runs when the prompt is sent.
+    """
+    __slots__ = ("suffix", "_policy")
+
+    cache_prefix = HR_BOT_PREFIX
+
+    def __init__(self, suffix: str, policy: Union[str, Callable[[], str]]):
+        self.suffix = suffix
+        self._policy = policy
+
+    @property
+    def policy(self) -> str:
+        if callable(self._policy):
+            self._policy = self._policy()
+        return self._policy
+
+    @property
+    def dynamic(self) -> str:
+        return f"Company Leave Policy (relevant sections):\n{self.policy}\n\n{self.suffix}"
+
+    @property
+    def text(self) -> str:
+        return f"{HR_BOT_PREFIX}\n{self.dynamic}"
+
+def get_hr_bot_prompt(
+    user_name: str,
+    channel_type: str,
+    conversation_history: str,
+    user_message: str,
+    leave_info: Dict[str, Any],
+    leave_policy: Union[str, Callable[[], str]] = LEAVE_POLICY
+) -> LLMPrompt:
+    """
+    Generate the prompt for the HR bot with context about leave information and policy.
+    
+    Args:
+        user_name: Name of the user asking the question
+        channel_type: Type of channel (dm/channel)
+        conversation_history: Previous conversation messages
+        user_message: Current message from the user
+        leave_info: Dictionary containing leave balance and transactions
+        leave_policy: Company leave policy text, normally only the sections relevant
+            to the question (defaults to the full LEAVE_POLICY), or a callable
+            returning it
+    """
+    
+    # Format leave information
+    leave_context = format_leave_info(leave_info)
+
+    suffix = f"""You're talking to {user_name} in a {channel_type} channel.
+
+Available Leave Information:
+{json.dumps(leave_context, indent=2)}
+
+Previous conversation:
+{conversation_history}
+
+Current message from {user_name}:
+{user_message}
 
-Please provide a clear, focused response to the user's question. It should be a flowing conversation you can be flexible in how you want to answer each question, sound like a human""" 
\ No newline at end of file
+Please provide a clear, focused response to the user's question. It should be a flowing conversation you can be flexible in how you want to answer each question, sound like a human"""
+    return LLMPrompt(suffix, leave_policy)
@@ -3,10 +3,10 @@ from typing import Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status, Cookie, Request
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.database.base import get_db
+from app.database.base import get_async_db
 from app.models.user import User
 from app.utils.cookie_utils import decrypt_cookie_value, AUTH_COOKIE_NAME
 
@@ -44,7 +44,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 async def get_current_user_from_cookie(
     auth_data: Optional[str] = Cookie(None, alias=AUTH_COOKIE_NAME),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Dependency to get current user from cookie"""
     credentials_exception = HTTPException(
@@ -74,7 +74,7 @@ async def get_current_user_from_cookie(
     except (JWTError, ValueError) as e:
         raise credentials_exception
         
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if user is None:
         raise credentials_exception
         
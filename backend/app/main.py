@@ -1,4 +1,5 @@
 import os
+import asyncio
 import logging
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
@@ -8,6 +9,11 @@ from dotenv import load_dotenv
 from app.core.config import get_settings
 from app.api.endpoints import mcp, slack, company, auth
 from app.database.base import init_db
+from app.services.slack_client import init_slack_client, close_slack_client
+from app.services.mcp_dispatch import mcp_dispatcher
+from app.services.employee_directory import employee_directory
+from app.services.greyt_hr_client import greythr_http
+from app.services.greyt_hr_tokens import token_manager
 
 # Load environment variables
 load_dotenv()
@@ -42,8 +48,25 @@ app.include_router(company.router, prefix=f"{settings.API_V1_STR}/companies", ta
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup"""
+    """Initialize database and employee directory, resolve Slack identity and caches, and start Slack event workers on startup"""
     init_db()
+    await employee_directory.reload()
+    await greythr_http.start()
+    await token_manager.start()
+    await init_slack_client()
+    await slack.resolve_bot_identity()
+    # users.list is a low-tier method, so warm the cache without holding up startup
+    app.state.user_cache_preload = asyncio.create_task(slack.user_cache.preload())
+    await slack.event_pool.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Drain queued Slack events and close the Slack and GreytHR connection pools before the process exits"""
+    await slack.event_pool.shutdown()
+    await close_slack_client()
+    await mcp_dispatcher.close()
+    await token_manager.stop()
+    await greythr_http.close()
 
 @app.get("/")
 async def root():
@@ -62,7 +85,8 @@ async def health_check():
         "services": {
             "mcp_server": "running",
             "slack_events": "running"
-        }
+        },
+        "slack_event_queue": slack.event_pool.stats()
     }
 
 if __name__ == "__main__":
@@ -13,6 +13,9 @@ class Employee(Base):
     name = Column(String, nullable=False)
     email = Column(String, nullable=False, index=True)
     
+    # Slack user matched by email during employee sync
+    slack_user_id = Column(String(32), nullable=True, index=True)
+    
     # Company relationship
     company_id = Column(String(36), ForeignKey('companies.id', ondelete='CASCADE'), nullable=False)
     company = relationship("Company", back_populates="employees")
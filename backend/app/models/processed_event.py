@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime
+from app.database.base import Base
+
+class ProcessedEvent(Base):
+    """Slack event ids already accepted, shared across workers for de-duplication"""
+    __tablename__ = "slack_processed_events"
+
+    event_id = Column(String(255), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ProcessedEvent(event_id='{self.event_id}', expires_at='{self.expires_at}')>"
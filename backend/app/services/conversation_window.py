@@ -0,0 +1,143 @@
+import os
+import time
+import logging
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Conversation window settings
+SLACK_HISTORY_WINDOW = int(os.getenv("SLACK_HISTORY_WINDOW", "10"))
+SLACK_HISTORY_MAX_MESSAGES = int(os.getenv("SLACK_HISTORY_MAX_MESSAGES", "50000"))
+# Seconds a window is trusted after its cold fetch before it is fetched again
+SLACK_HISTORY_MAX_AGE = float(os.getenv("SLACK_HISTORY_MAX_AGE", "300"))
+
+ConversationKey = Tuple[str, Optional[str]]
+
+class ConversationWindowCache:
+    """Ring buffers of already-enriched messages per channel and per thread.
+
+    A window is filled by one cold fetch and then kept current from the
+    message events Slack already sends us, so a mention does not re-fetch
+    and re-enrich the last N messages every time. Windows hold newest
+    first, matching conversations_history. Total memory is bounded by
+    max_messages; the least recently used conversations go first.
+
+    Windows are per process and only see the events this process handles.
+    With several workers, or after a missed or deduplicated event, a window
+    can fall behind, so each one is dropped max_age seconds after its cold
+    fetch (appends do not extend it) and the next request fetches again.
+    """
+
+    def __init__(
+        self,
+        window_size: int = SLACK_HISTORY_WINDOW,
+        max_messages: int = SLACK_HISTORY_MAX_MESSAGES,
+        max_age: float = SLACK_HISTORY_MAX_AGE
+    ):
+        self.window_size = window_size
+        self.max_messages = max_messages
+        self.max_age = max_age
+        self.windows: "OrderedDict[ConversationKey, deque]" = OrderedDict()
+        self.loaded_at: Dict[ConversationKey, float] = {}
+        self.total_messages = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def _window(self, key: ConversationKey) -> Optional[deque]:
+        """The window for a key, dropping it first if it is past max_age"""
+        window = self.windows.get(key)
+        if window is not None and time.monotonic() - self.loaded_at[key] >= self.max_age:
+            self.drop(*key)
+            self.expired += 1
+            return None
+        return window
+
+    def has(self, channel: str, thread_ts: Optional[str] = None) -> bool:
+        return self._window((channel, thread_ts)) is not None
+
+    def get(self, channel: str, thread_ts: Optional[str] = None, limit: int = None) -> Optional[List[Dict[str, Any]]]:
+        """Newest-first messages for a conversation, or None if it is not cached or too old"""
+        key = (channel, thread_ts)
+        window = self._window(key)
+        if window is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.windows.move_to_end(key)
+        messages = list(window)
+        return messages[:limit] if limit else messages
+
+    def put(self, channel: str, thread_ts: Optional[str], messages: List[Dict[str, Any]]) -> None:
+        """Store a cold-fetched newest-first window"""
+        key = (channel, thread_ts)
+        self.drop(channel, thread_ts)
+        window = deque(messages[:self.window_size], maxlen=self.window_size)
+        self.windows[key] = window
+        self.loaded_at[key] = time.monotonic()
+        self.total_messages += len(window)
+        self._evict()
+
+    def append(self, channel: str, thread_ts: Optional[str], message: Dict[str, Any]) -> bool:
+        """Add a new message to a warm window; cold conversations are left for the next fetch"""
+        key = (channel, thread_ts)
+        window = self._window(key)
+        if window is None:
+            return False
+        self.windows.move_to_end(key)
+        if any(m.get("ts") == message.get("ts") for m in window):
+            return True
+        if len(window) < self.window_size:
+            self.total_messages += 1
+        window.appendleft(message)
+        self._evict()
+        return True
+
+    def may_contain(self, channel: str, thread_ts: Optional[str], ts: Optional[str]) -> bool:
+        """Whether the message `ts` could be in a warm window.
+
+        True when it is there, or when it is newer than the oldest message
+        held (one whose event we missed); older messages cannot be.
+        """
+        window = self._window((channel, thread_ts))
+        if window is None:
+            return False
+        if not ts or not window:
+            return True
+        if any(m.get("ts") == ts for m in window):
+            return True
+        oldest = window[-1].get("ts")
+        try:
+            return oldest is None or float(ts) >= float(oldest)
+        except ValueError:
+            return True
+
+    def drop(self, channel: str, thread_ts: Optional[str] = None) -> None:
+        """Forget a conversation, e.g. after an edit or delete we cannot apply in place"""
+        window = self.windows.pop((channel, thread_ts), None)
+        self.loaded_at.pop((channel, thread_ts), None)
+        if window is not None:
+            self.total_messages -= len(window)
+
+    def _evict(self) -> None:
+        while self.total_messages > self.max_messages and self.windows:
+            key, window = self.windows.popitem(last=False)
+            self.loaded_at.pop(key, None)
+            self.total_messages -= len(window)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "conversations": len(self.windows),
+            "messages": self.total_messages,
+            "max_messages": self.max_messages,
+            "max_age": self.max_age,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expired": self.expired
+        }
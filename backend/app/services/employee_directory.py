@@ -0,0 +1,222 @@
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from sqlalchemy import select
+from app.database.base import AsyncSessionLocal
+from app.models.employee import Employee
+from app.models.company import Company
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def company_domain(name: str) -> str:
+    """x-greythr-domain header value for a company: {company_name}.greythr.com"""
+    return f"{name.lower().replace(' ', '').replace('-', '')}.greythr.com"
+
+class CompanyHandle:
+    """Company fields needed to call GreytHR; one instance shared by all of its employees"""
+    __slots__ = ("id", "name", "domain", "access_token", "token_expiry")
+
+    def __init__(self, id: str, name: str, access_token: Optional[str], token_expiry: Optional[datetime]):
+        self.id = id
+        self.name = name
+        self.domain = company_domain(name)
+        self.access_token = access_token
+        self.token_expiry = token_expiry
+
+class EmployeeRecord:
+    """Read-only employee entry; exposes the Employee attributes the leave API uses"""
+    __slots__ = ("id", "employee_id", "name", "email", "company", "slack_user_id")
+
+    def __init__(
+        self,
+        id: str,
+        employee_id: int,
+        name: str,
+        email: str,
+        company: CompanyHandle,
+        slack_user_id: Optional[str] = None
+    ):
+        self.id = id
+        self.employee_id = employee_id
+        self.name = name
+        self.email = email
+        self.company = company
+        self.slack_user_id = slack_user_id
+
+    @property
+    def company_id(self) -> str:
+        return self.company.id
+
+    def __repr__(self):
+        return f"<EmployeeRecord(employee_id='{self.employee_id}', email='{self.email}')>"
+
+class DirectorySnapshot:
+    """One immutable generation of the directory indexes"""
+    __slots__ = ("companies", "by_email", "by_slack_id", "by_employee_id", "loaded_at")
+
+    def __init__(self):
+        self.companies: Dict[str, CompanyHandle] = {}
+        self.by_email: Dict[str, EmployeeRecord] = {}
+        self.by_slack_id: Dict[str, EmployeeRecord] = {}
+        self.by_employee_id: Dict[Tuple[str, int], EmployeeRecord] = {}
+        self.loaded_at: Optional[float] = None
+
+class EmployeeDirectory:
+    """In-process index of every employee and their company's GreytHR handle.
+
+    Lets the message path go from an email or Slack user id to the employee
+    and its company token without a database round trip. Records use
+    __slots__ and share one CompanyHandle per company, which keeps 100k
+    employees to a few tens of MB. A reload builds a complete new snapshot
+    off to the side and swaps it in with a single assignment, so readers
+    never see a half-built index.
+    """
+
+    def __init__(self):
+        self.snapshot = DirectorySnapshot()
+        # Slack users linked since the snapshot was built
+        self.slack_links: Dict[str, EmployeeRecord] = {}
+        self.reload_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.last_load_seconds = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self.snapshot.loaded_at is not None
+
+    def by_email(self, email: Optional[str]) -> Optional[EmployeeRecord]:
+        if not email:
+            return None
+        return self._count(self.snapshot.by_email.get(email.strip().lower()))
+
+    def by_slack_id(self, slack_user_id: Optional[str]) -> Optional[EmployeeRecord]:
+        if not slack_user_id:
+            return None
+        record = self.snapshot.by_slack_id.get(slack_user_id) or self.slack_links.get(slack_user_id)
+        return self._count(record)
+
+    def by_employee_id(self, company_id: str, employee_id: int) -> Optional[EmployeeRecord]:
+        return self._count(self.snapshot.by_employee_id.get((company_id, int(employee_id))))
+
+    def company(self, company_id: str) -> Optional[CompanyHandle]:
+        return self.snapshot.companies.get(company_id)
+
+    def _count(self, record: Optional[EmployeeRecord]) -> Optional[EmployeeRecord]:
+        if record is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return record
+
+    def link_slack_user(self, slack_user_id: str, record: EmployeeRecord) -> None:
+        """Index a Slack user matched after the last load (the caller persists it).
+
+        The snapshot is left alone: a linked copy of the record goes into a
+        small overlay consulted by by_slack_id(), so a link costs O(1). The
+        next reload reads the persisted link from the database and drops it
+        from the overlay.
+        """
+        self.slack_links[slack_user_id] = EmployeeRecord(
+            record.id, record.employee_id, record.name, record.email, record.company, slack_user_id
+        )
+
+    def update_company_token(self, company: Company) -> None:
+        """Push a refreshed access token into the shared handle"""
+        handle = self.snapshot.companies.get(company.id)
+        if handle is not None:
+            handle.access_token = company.access_token
+            handle.token_expiry = company.token_expiry
+
+    async def reload(self) -> bool:
+        """Rebuild every index from the database and swap the new snapshot in"""
+        async with self.reload_lock:
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    # Column tuples, not ORM objects: nothing lands in the identity map
+                    companies = await db.execute(
+                        select(Company.id, Company.name, Company.access_token, Company.token_expiry)
+                    )
+                    employees = await db.execute(
+                        select(
+                            Employee.id,
+                            Employee.employee_id,
+                            Employee.name,
+                            Employee.email,
+                            Employee.company_id,
+                            Employee.slack_user_id
+                        )
+                    )
+                    snapshot = self._build(companies.all(), employees.all())
+            except Exception as e:
+                # Lookups fall back to the database, so keep serving the old snapshot
+                logger.error(f"Error loading employee directory: {str(e)}")
+                return False
+
+            self.snapshot = snapshot
+            # Links the new snapshot already has were persisted before it was read;
+            # the rest are moved onto the new company handles
+            self.slack_links = {
+                slack_user_id: EmployeeRecord(
+                    record.id, record.employee_id, record.name, record.email,
+                    snapshot.companies[record.company_id], slack_user_id
+                )
+                for slack_user_id, record in self.slack_links.items()
+                if slack_user_id not in snapshot.by_slack_id and record.company_id in snapshot.companies
+            }
+            self.reloads += 1
+            self.last_load_seconds = time.perf_counter() - started
+            logger.info(
+                f"Employee directory loaded {len(snapshot.by_employee_id)} employees across "
+                f"{len(snapshot.companies)} companies in {self.last_load_seconds * 1000:.0f}ms"
+            )
+            return True
+
+    def _build(self, company_rows, employee_rows) -> DirectorySnapshot:
+        snapshot = DirectorySnapshot()
+        for company_id, name, access_token, token_expiry in company_rows:
+            snapshot.companies[company_id] = CompanyHandle(company_id, name, access_token, token_expiry)
+
+        duplicates = 0
+        for id, employee_id, name, email, company_id, slack_user_id in employee_rows:
+            company = snapshot.companies.get(company_id)
+            if company is None:
+                continue
+            record = EmployeeRecord(id, int(employee_id), name, email, company, slack_user_id)
+            snapshot.by_employee_id[(company.id, record.employee_id)] = record
+            if slack_user_id:
+                snapshot.by_slack_id[slack_user_id] = record
+            key = email.strip().lower()
+            if key in snapshot.by_email:
+                duplicates += 1
+            snapshot.by_email[key] = record
+        if duplicates:
+            logger.warning(f"{duplicates} employee emails appear more than once; the last record wins")
+
+        snapshot.loaded_at = time.time()
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        """Index sizes, hit/miss counters and load timing"""
+        snapshot = self.snapshot
+        lookups = self.hits + self.misses
+        return {
+            "loaded": self.loaded,
+            "employees": len(snapshot.by_employee_id),
+            "companies": len(snapshot.companies),
+            "slack_links": len(snapshot.by_slack_id) + len(self.slack_links),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "reloads": self.reloads,
+            "last_load_ms": round(self.last_load_seconds * 1000, 1),
+            "loaded_at": snapshot.loaded_at
+        }
+
+employee_directory = EmployeeDirectory()
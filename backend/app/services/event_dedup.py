@@ -0,0 +1,138 @@
+import os
+import time
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import create_engine, delete
+from sqlalchemy.engine import Engine
+from app.models.processed_event import ProcessedEvent
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# De-duplication settings
+SLACK_DEDUP_BACKEND = os.getenv("SLACK_DEDUP_BACKEND", "memory")  # memory | postgres | sqlite
+SLACK_DEDUP_TTL_SECONDS = int(os.getenv("SLACK_DEDUP_TTL_SECONDS", "300"))
+SLACK_DEDUP_MAX_ENTRIES = int(os.getenv("SLACK_DEDUP_MAX_ENTRIES", "100000"))
+SLACK_DEDUP_SQLITE_PATH = os.getenv("SLACK_DEDUP_SQLITE_PATH", "slack_dedup.db")
+SLACK_DEDUP_PURGE_INTERVAL = int(os.getenv("SLACK_DEDUP_PURGE_INTERVAL", "60"))
+
+class EventDedupBackend(ABC):
+    """Storage for Slack event ids that have already been accepted"""
+
+    @abstractmethod
+    async def check_and_add(self, event_id: str) -> bool:
+        """Record event_id and return True if it was already recorded and not yet expired"""
+
+class InMemoryDedupBackend(EventDedupBackend):
+    """Per-process TTL set with amortized O(1) insert, check and expiry.
+
+    Every entry gets the same TTL, so insertion order is also expiry order:
+    expired ids are always at the front of the OrderedDict and are popped
+    from there. The max_entries cap evicts the oldest ids first.
+    """
+
+    def __init__(self, ttl_seconds: int = SLACK_DEDUP_TTL_SECONDS, max_entries: int = SLACK_DEDUP_MAX_ENTRIES):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, float]" = OrderedDict()
+
+    def _expire(self, now: float) -> None:
+        while self.entries:
+            event_id, expires_at = next(iter(self.entries.items()))
+            if expires_at > now:
+                break
+            self.entries.popitem(last=False)
+
+    async def check_and_add(self, event_id: str) -> bool:
+        now = time.monotonic()
+        self._expire(now)
+
+        if event_id in self.entries:
+            return True
+
+        self.entries[event_id] = now + self.ttl
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return False
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+class SQLDedupBackend(EventDedupBackend):
+    """Dedup state in a shared table so several uvicorn workers or nodes agree.
+
+    Uses INSERT .. ON CONFLICT so the check and the insert are one atomic
+    statement; an expired row is taken over in the same statement. Works on
+    Postgres and on SQLite as a local stand-in.
+    """
+
+    def __init__(self, engine: Engine, ttl_seconds: int = SLACK_DEDUP_TTL_SECONDS):
+        self.engine = engine
+        self.ttl = ttl_seconds
+        self.last_purge = 0.0
+        if engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif engine.dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise ValueError(f"Unsupported dedup database dialect: {engine.dialect.name}")
+        self.insert = insert
+        ProcessedEvent.__table__.create(bind=engine, checkfirst=True)
+
+    def _check_and_add(self, event_id: str) -> bool:
+        table = ProcessedEvent.__table__
+        now = datetime.utcnow()
+        stmt = self.insert(table).values(event_id=event_id, expires_at=now + timedelta(seconds=self.ttl))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.event_id],
+            set_={"expires_at": stmt.excluded.expires_at},
+            where=table.c.expires_at < now
+        )
+        with self.engine.begin() as conn:
+            result = conn.execute(stmt)
+            if time.monotonic() - self.last_purge > SLACK_DEDUP_PURGE_INTERVAL:
+                self.last_purge = time.monotonic()
+                conn.execute(delete(table).where(table.c.expires_at < now))
+        # No row inserted or taken over means a live row already exists
+        return result.rowcount == 0
+
+    async def check_and_add(self, event_id: str) -> bool:
+        return await asyncio.to_thread(self._check_and_add, event_id)
+
+def create_dedup_backend(kind: str = SLACK_DEDUP_BACKEND) -> EventDedupBackend:
+    """Build the configured dedup backend"""
+    if kind == "postgres":
+        from app.database.base import engine
+        return SQLDedupBackend(engine)
+    if kind == "sqlite":
+        return SQLDedupBackend(create_engine(f"sqlite:///{SLACK_DEDUP_SQLITE_PATH}"))
+    if kind != "memory":
+        logger.warning(f"Unknown dedup backend '{kind}', using in-memory store")
+    return InMemoryDedupBackend()
+
+class EventDedupStore:
+    """Front for the configured backend; the backend is created lazily on first use"""
+
+    def __init__(self, backend: Optional[EventDedupBackend] = None):
+        self.backend = backend
+        self.duplicates = 0
+
+    async def is_duplicate(self, event_id: str) -> bool:
+        if self.backend is None:
+            self.backend = create_dedup_backend()
+        try:
+            duplicate = await self.backend.check_and_add(event_id)
+        except Exception as e:
+            # Failing open is safer than dropping a real user message
+            logger.error(f"Dedup backend error, treating event as new: {str(e)}")
+            return False
+        if duplicate:
+            self.duplicates += 1
+        return duplicate
+
+event_dedup_store = EventDedupStore()
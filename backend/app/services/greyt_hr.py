@@ -1,12 +1,16 @@
 import os
 import logging
-import aiohttp
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, List
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.employee import Employee
 from app.models.company import Company
-from app.database.base import get_db
+from app.database.base import get_db, AsyncSessionLocal
+from app.services.greyt_hr_client import GreytHRHttpClient, greythr_http
+from app.services.greyt_hr_tokens import GreytHRTokenManager, token_manager
+from app.services.greyt_hr_tenant import GreytHRTenantClient
+from app.services.leave_cache import LeaveCache, leave_cache
+from app.services.employee_directory import employee_directory, company_domain
 from app.core.config import get_settings
 
 # Get settings
@@ -17,110 +21,104 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class GreytHRLeaveAPI:
-    def __init__(self):
-        self.company: Optional[Company] = None
+    """Stateless entry point for leave data across all companies.
+
+    Per-company GreytHRTenantClient objects are cached by company id and
+    rebuilt only when the company's domain changes; nothing on this object
+    changes per request, so the module-level instance is safe to share.
+    """
+
+    def __init__(
+        self,
+        http: GreytHRHttpClient = greythr_http,
+        cache: LeaveCache = leave_cache,
+        tokens: GreytHRTokenManager = token_manager
+    ):
+        self.http = http
+        self.cache = cache
+        self.tokens = tokens
         self.base_url = settings.GREYT_HR_API_BASE_URL
-        self.domain = None
+        self.tenants: Dict[str, GreytHRTenantClient] = {}
 
-    def get_company_token(self, db: Session, employee: Employee) -> Optional[str]:
-        """Get company's access token from database using employee's company"""
-        # Explicitly query the company from database
-        print("i am employee", employee.company_id)
-        company = db.query(Company).filter_by(id=employee.company_id).first()
-        
-        if not company:
-            raise Exception(f"Company not found for employee {employee.email}")
-            
-        self.company = company
-            
-        if not self.company.access_token:
-            raise Exception(f"No access token found for company {self.company.name}")
-            
-        # Check if token is expired
-        if self.company.token_expiry and self.company.token_expiry < datetime.utcnow():
-            raise Exception(f"Access token for company {self.company.name} has expired")
-            
-        # Construct domain for x-greythr-domain header using company name
-        # Format: {company_name}.greythr.com
-        self.domain = f"{company.name.lower().replace(' ', '').replace('-', '')}.greythr.com"
-        logger.info(f"Using domain: {self.domain}")
-            
-        return self.company.access_token
-
-    async def get_leave_balance(self, db: Session, employee: Employee, year: int = None) -> Dict[str, Any]:
-        """Get employee's leave balance for a given year"""
-        token = self.get_company_token(db, employee)
-        if not token:
-            raise Exception("No valid access token available")
+    async def get_tenant(self, db: AsyncSession, company_id: str) -> GreytHRTenantClient:
+        """Client for one company, from the tenant cache when its domain is unchanged"""
+        tenant = self.tenants.get(company_id)
+        handle = employee_directory.company(company_id)
+        if tenant is not None and (handle is None or handle.domain == tenant.domain):
+            return tenant
 
-        if not self.domain:
-            raise Exception("Domain not set. Make sure company record exists in database.")
+        # The directory already holds the company; only query it on a miss
+        company = handle or await db.get(Company, company_id)
+        if not company:
+            raise Exception(f"Company {company_id} not found")
+
+        tenant = GreytHRTenantClient(
+            company_id,
+            company_domain(company.name),
+            self.base_url,
+            self.http,
+            self.tokens
+        )
+        self.tenants[company_id] = tenant
+        logger.info(f"Using domain: {tenant.domain}")
+        return tenant
+
+    def drop_tenant(self, company_id: str) -> None:
+        """Forget the cached client, e.g. after the company's domain changed"""
+        self.tenants.pop(company_id, None)
+
+    async def _load_in_new_session(self, fetch, employee: Employee, *args) -> Dict[str, Any]:
+        # Stale entries refresh after the caller's session is gone, so loads bring their own
+        async with AsyncSessionLocal() as db:
+            return await fetch(db, employee, *args)
+
+    async def get_leave_balance(self, db: AsyncSession, employee: Employee, year: int = None) -> Dict[str, Any]:
+        """Get employee's leave balance for a given year, served from the leave cache"""
+        if year is None:
+            year = datetime.now().year
+        key = ("balance", employee.company_id, int(employee.employee_id), year)
+        return await self.cache.get(
+            key,
+            lambda: self._load_in_new_session(self.fetch_leave_balance, employee, year)
+        )
 
+    async def get_leave_transactions(
+        self, 
+        db: AsyncSession, 
+        employee: Employee,
+        start_date: str, 
+        end_date: str
+    ) -> Dict[str, Any]:
+        """Get employee's leave transactions for a given date range, served from the leave cache"""
+        key = ("transactions", employee.company_id, int(employee.employee_id), start_date, end_date)
+        return await self.cache.get(
+            key,
+            lambda: self._load_in_new_session(self.fetch_leave_transactions, employee, start_date, end_date)
+        )
+
+    async def fetch_leave_balance(self, db: AsyncSession, employee: Employee, year: int = None) -> Dict[str, Any]:
+        """Get employee's leave balance for a given year from GreytHR"""
         # Use current year if not specified
         if year is None:
             year = datetime.now().year
 
-        url = f"{self.base_url}/leave/v2/employee/{employee.employee_id}/years/{year}/balance"
-        print("I AM URL: ", url)
-        
-        headers = {
-            "ACCESS-TOKEN": token,
-            "x-greythr-domain": self.domain
-        }
-
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Failed to get leave balance. Status: {response.status}")
-                        logger.error(f"Response: {error_text}")
-                        raise Exception(f"Failed to get leave balance: {error_text}")
-
-                    print("I AM leave RESPONSE: ", await response.json())
-                    return await response.json()
-        except aiohttp.ClientError as e:
-            raise Exception(f"Network error while fetching leave balance: {str(e)}")
+        tenant = await self.get_tenant(db, employee.company_id)
+        return await tenant.get_leave_balance(employee.employee_id, year)
 
-    async def get_leave_transactions(
+    async def fetch_leave_transactions(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         employee: Employee,
         start_date: str, 
         end_date: str
     ) -> Dict[str, Any]:
-        """Get employee's leave transactions for a given date range"""
-        token = self.get_company_token(db, employee)
-        if not token:
-            raise Exception("No valid access token available")
-
-        if not self.domain:
-            raise Exception("Domain not set. Make sure company record exists in database.")
-
-        url = f"{self.base_url}/leave/v2/employee/{employee.employee_id}/transactions"
-        params = {
-            "start": start_date,
-            "end": end_date
-        }
-        
-        headers = {
-            "ACCESS-TOKEN": token,
-            "x-greythr-domain": self.domain
-        }
-
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, params=params) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Failed to get leave transactions. Status: {response.status}")
-                        logger.error(f"Response: {error_text}")
-                        raise Exception(f"Failed to get leave transactions: {error_text}")
-                    
-                    return await response.json()
-        except aiohttp.ClientError as e:
-            logger.error(f"Network error: {str(e)}")
-            raise Exception(f"Network error while fetching leave transactions: {str(e)}")
+        """Get employee's leave transactions for a given date range from GreytHR"""
+        tenant = await self.get_tenant(db, employee.company_id)
+        return await tenant.get_leave_transactions(employee.employee_id, start_date, end_date)
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state, retries and hedges for each tenant that has been called"""
+        return {tenant.domain: tenant.resilience.stats() for tenant in self.tenants.values()}
 
     def format_leave_balance(self, balance_data: Dict[str, Any]) -> str:
         """Format leave balance data into a readable message"""
@@ -164,4 +162,6 @@ class GreytHRLeaveAPI:
                 message += f"• Reason: {transaction['reason']}\n"
             message += "\n"
             
-        return message 
\ No newline at end of file
+        return message 
+
+leave_api = GreytHRLeaveAPI()
@@ -0,0 +1,76 @@
+import os
+import logging
+import aiohttp
+from typing import Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Connection pool settings for GreytHR
+GREYTHR_HTTP_POOL_SIZE = int(os.getenv("GREYTHR_HTTP_POOL_SIZE", "100"))
+GREYTHR_HTTP_PER_HOST = int(os.getenv("GREYTHR_HTTP_PER_HOST", "20"))
+GREYTHR_HTTP_KEEPALIVE = float(os.getenv("GREYTHR_HTTP_KEEPALIVE", "30"))
+GREYTHR_HTTP_DNS_TTL = int(os.getenv("GREYTHR_HTTP_DNS_TTL", "300"))
+GREYTHR_HTTP_CONNECT_TIMEOUT = float(os.getenv("GREYTHR_HTTP_CONNECT_TIMEOUT", "5"))
+GREYTHR_HTTP_READ_TIMEOUT = float(os.getenv("GREYTHR_HTTP_READ_TIMEOUT", "20"))
+GREYTHR_HTTP_TIMEOUT = float(os.getenv("GREYTHR_HTTP_TIMEOUT", "30"))
+
+class GreytHRHttpClient:
+    """One keep-alive connection pool for every GreytHR request.
+
+    Each tenant has its own {company}.greythr.com host (plus the shared API
+    host), so the per-host limit keeps one busy tenant from taking the whole
+    pool. Opened on startup and closed on shutdown; `session` also opens it
+    lazily for scripts that run outside the app.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = GREYTHR_HTTP_POOL_SIZE,
+        per_host: int = GREYTHR_HTTP_PER_HOST,
+        connect_timeout: float = GREYTHR_HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = GREYTHR_HTTP_READ_TIMEOUT,
+        total_timeout: float = GREYTHR_HTTP_TIMEOUT
+    ):
+        self.pool_size = pool_size
+        self.per_host = per_host
+        self.timeout = aiohttp.ClientTimeout(
+            total=total_timeout,
+            connect=connect_timeout,
+            sock_read=read_timeout
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._open()
+        return self._session
+
+    def _open(self) -> None:
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.per_host,
+            keepalive_timeout=GREYTHR_HTTP_KEEPALIVE,
+            ttl_dns_cache=GREYTHR_HTTP_DNS_TTL
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    async def start(self) -> None:
+        """Open the pool up front so the first request does not pay for it"""
+        if self._session is None or self._session.closed:
+            self._open()
+        logger.info(f"GreytHR connection pool ready (size {self.pool_size}, {self.per_host} per host)")
+
+    async def close(self) -> None:
+        """Close the pooled session on shutdown"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+greythr_http = GreytHRHttpClient()
@@ -0,0 +1,224 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Resilience settings for GreytHR calls
+GREYTHR_RETRY_ATTEMPTS = int(os.getenv("GREYTHR_RETRY_ATTEMPTS", "2"))
+GREYTHR_RETRY_BASE_DELAY = float(os.getenv("GREYTHR_RETRY_BASE_DELAY", "0.2"))
+GREYTHR_RETRY_MAX_DELAY = float(os.getenv("GREYTHR_RETRY_MAX_DELAY", "2"))
+GREYTHR_CALL_DEADLINE = float(os.getenv("GREYTHR_CALL_DEADLINE", "8"))
+GREYTHR_BREAKER_FAILURES = int(os.getenv("GREYTHR_BREAKER_FAILURES", "5"))
+GREYTHR_BREAKER_RESET = float(os.getenv("GREYTHR_BREAKER_RESET", "30"))
+GREYTHR_HEDGE_ENABLED = os.getenv("GREYTHR_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+GREYTHR_HEDGE_PERCENTILE = float(os.getenv("GREYTHR_HEDGE_PERCENTILE", "0.95"))
+GREYTHR_HEDGE_MIN_DELAY = float(os.getenv("GREYTHR_HEDGE_MIN_DELAY", "0.1"))
+
+# Samples needed before the latency percentile is trusted for hedging
+MIN_LATENCY_SAMPLES = 20
+
+class GreytHRAPIError(Exception):
+    """A failed GreytHR call; status is None for network errors and timeouts"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def retryable(self) -> bool:
+        # Network errors, throttling and server errors; other 4xx will not change on retry
+        return self.status is None or self.status == 429 or self.status >= 500
+
+class CircuitOpenError(GreytHRAPIError):
+    """Raised without calling GreytHR while the breaker is open"""
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures and fails fast for `reset_after` seconds.
+
+    After that one probe call is let through (half-open): success closes the
+    breaker, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int = GREYTHR_BREAKER_FAILURES, reset_after: float = GREYTHR_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = 0.0
+        # When the half-open probe started; a probe whose caller vanished expires after reset_after
+        self.probe_started = 0.0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.threshold:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at < self.reset_after:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if state == self.HALF_OPEN and now - self.probe_started >= self.reset_after:
+            self.probe_started = now
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        self.probe_started = 0.0
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.release_probe()
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.release_probe()
+        if self.failures >= self.threshold:
+            if self.failures == self.threshold:
+                self.opened += 1
+            self.opened_at = time.monotonic()
+
+class ResiliencePolicy:
+    """Retries, circuit breaking, hedging and a deadline around one tenant's GreytHR calls.
+
+    Each call gets GREYTHR_CALL_DEADLINE seconds in total. Idempotent calls
+    are retried on retryable errors with exponential backoff and full
+    jitter, and may be hedged: when the first attempt runs longer than the
+    recent p95 latency, a second identical request is sent and whichever
+    answers first wins.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_retries: int = GREYTHR_RETRY_ATTEMPTS,
+        deadline: float = GREYTHR_CALL_DEADLINE,
+        hedge: bool = GREYTHR_HEDGE_ENABLED,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.name = name
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies: deque = deque(maxlen=200)
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.short_circuited = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+    async def call(self, func: Callable[[], Awaitable[Any]], idempotent: bool = True) -> Any:
+        """Run func under the policy; func must raise GreytHRAPIError for failures worth counting"""
+        self.calls += 1
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            raise CircuitOpenError(f"GreytHR circuit open for {self.name}")
+
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + self.deadline
+        attempt = 0
+        while True:
+            started = loop.time()
+            try:
+                result = await asyncio.wait_for(self._attempt(func, idempotent), give_up_at - started)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self.failures += 1
+                self.breaker.record_failure()
+                raise GreytHRAPIError(f"GreytHR call for {self.name} exceeded its {self.deadline}s deadline")
+            except GreytHRAPIError as e:
+                if not e.retryable:
+                    # GreytHR answered; the request itself was wrong
+                    self.breaker.record_success()
+                    self.failures += 1
+                    raise
+                self.breaker.record_failure()
+                delay = random.uniform(0, min(GREYTHR_RETRY_MAX_DELAY, GREYTHR_RETRY_BASE_DELAY * 2 ** attempt))
+                if (
+                    not idempotent
+                    or attempt >= self.max_retries
+                    or loop.time() + delay >= give_up_at
+                    or not self.breaker.allow()
+                ):
+                    self.failures += 1
+                    raise
+                attempt += 1
+                self.retries += 1
+                logger.warning(f"GreytHR call for {self.name} failed ({str(e)}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                # Not a GreytHR availability problem (e.g. a malformed body); do not count it
+                self.failures += 1
+                self.breaker.release_probe()
+                raise
+
+            self.breaker.record_success()
+            self.latencies.append(loop.time() - started)
+            return result
+
+    async def _attempt(self, func: Callable[[], Awaitable[Any]], idempotent: bool) -> Any:
+        tasks: List[asyncio.Task] = [asyncio.ensure_future(func())]
+        try:
+            threshold = self.latency_percentile(GREYTHR_HEDGE_PERCENTILE) if self.hedge and idempotent else None
+            if threshold is not None:
+                done, _ = await asyncio.wait(tasks, timeout=max(threshold, GREYTHR_HEDGE_MIN_DELAY))
+                if not done:
+                    self.hedges += 1
+                    tasks.append(asyncio.ensure_future(func()))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state, retry/hedge counters and recent latency"""
+        p95 = self.latency_percentile(0.95)
+        return {
+            "breaker": self.breaker.state,
+            "breaker_opened": self.breaker.opened,
+            "consecutive_failures": self.breaker.failures,
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "short_circuited": self.short_circuited,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
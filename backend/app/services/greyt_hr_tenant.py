@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import aiohttp
+from typing import Dict, Any, Optional
+from app.services.greyt_hr_client import GreytHRHttpClient
+from app.services.greyt_hr_resilience import ResiliencePolicy, GreytHRAPIError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class GreytHRTenantClient:
+    """GreytHR leave API calls for one company.
+
+    Holds only what identifies the tenant (company id, domain, base URL)
+    and never changes after construction. Every call asks the token source
+    for the current token and builds its own headers, so one instance can
+    be shared by any number of concurrent coroutines. A 401 means GreytHR
+    no longer accepts the token before its expiry; the token is invalidated
+    and the call made once more with a fresh login.
+    """
+
+    def __init__(self, company_id: str, domain: str, base_url: str, http: GreytHRHttpClient, tokens):
+        self.company_id = company_id
+        self.domain = domain
+        self.base_url = base_url
+        self.http = http
+        # Anything with `async get_token(company_id) -> str` and
+        # `invalidate(company_id, rejected)`, normally the token manager
+        self.tokens = tokens
+        # Retries, breaker and deadline are per tenant, so one failing company does not trip the others
+        self.resilience = ResiliencePolicy(domain)
+
+    async def get_json(self, path: str, what: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """GET a GreytHR endpoint as this tenant and return the JSON body"""
+        return await self.resilience.call(lambda: self._get_once(path, what, params), idempotent=True)
+
+    async def _get_once(self, path: str, what: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        token = await self._token()
+        try:
+            return await self._request(path, what, params, token)
+        except GreytHRAPIError as e:
+            if e.status != 401:
+                raise
+        logger.warning(f"GreytHR rejected the access token for {self.domain}, logging in again")
+        self.tokens.invalidate(self.company_id, token)
+        return await self._request(path, what, params, await self._token())
+
+    async def _token(self) -> str:
+        token = await self.tokens.get_token(self.company_id)
+        if not token:
+            raise Exception("No valid access token available")
+        return token
+
+    async def _request(self, path: str, what: str, params: Optional[Dict[str, Any]], token: str) -> Dict[str, Any]:
+        headers = {
+            "ACCESS-TOKEN": token,
+            "x-greythr-domain": self.domain
+        }
+
+        try:
+            async with self.http.session.get(f"{self.base_url}{path}", headers=headers, params=params) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"Failed to get {what} for {self.domain}. Status: {response.status}")
+                    logger.error(f"Response: {error_text}")
+                    raise GreytHRAPIError(f"Failed to get {what}: {error_text}", response.status)
+
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Network error: {str(e)}")
+            raise GreytHRAPIError(f"Network error while fetching {what}: {str(e)}")
+
+    async def get_leave_balance(self, employee_id: int, year: int) -> Dict[str, Any]:
+        """Get an employee's leave balance for a given year"""
+        return await self.get_json(f"/leave/v2/employee/{employee_id}/years/{year}/balance", "leave balance")
+
+    async def get_leave_transactions(self, employee_id: int, start_date: str, end_date: str) -> Dict[str, Any]:
+        """Get an employee's leave transactions for a given date range"""
+        return await self.get_json(
+            f"/leave/v2/employee/{employee_id}/transactions",
+            "leave transactions",
+            params={"start": start_date, "end": end_date}
+        )
+
+    def __repr__(self):
+        return f"<GreytHRTenantClient(company_id='{self.company_id}', domain='{self.domain}')>"
@@ -0,0 +1,186 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Set
+from sqlalchemy import select
+from app.database.base import AsyncSessionLocal
+from app.models.company import Company
+from app.services.greyt_hr_auth import get_and_store_greythr_token
+from app.services.employee_directory import employee_directory
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Token refresh settings
+GREYTHR_TOKEN_REFRESH_MARGIN = int(os.getenv("GREYTHR_TOKEN_REFRESH_MARGIN", "300"))
+GREYTHR_TOKEN_CHECK_INTERVAL = int(os.getenv("GREYTHR_TOKEN_CHECK_INTERVAL", "60"))
+
+class CachedToken:
+    __slots__ = ("access_token", "expires_at")
+
+    def __init__(self, access_token: str, expires_at: Optional[datetime]):
+        self.access_token = access_token
+        # Naive UTC, like companies.token_expiry; None means GreytHR gave no expiry
+        self.expires_at = expires_at
+
+    def expires_within(self, seconds: float) -> bool:
+        if self.expires_at is None:
+            return False
+        return self.expires_at - timedelta(seconds=seconds) <= datetime.utcnow()
+
+class GreytHRTokenManager:
+    """In-memory GreytHR access tokens, refreshed before they expire.
+
+    get_token() serves the cached token and only waits on a refresh when
+    the token is missing or already expired; tokens inside the refresh
+    margin are renewed in the background, and a periodic sweep renews
+    tokens nobody is asking for. Refreshes are single-flight per company.
+    Across nodes, the refresh runs under a row lock on the company
+    (SELECT ... FOR UPDATE): a node that waited on the lock finds the token
+    the first node stored and reuses it instead of requesting another.
+    """
+
+    def __init__(
+        self,
+        refresh_margin: int = GREYTHR_TOKEN_REFRESH_MARGIN,
+        check_interval: int = GREYTHR_TOKEN_CHECK_INTERVAL
+    ):
+        self.refresh_margin = refresh_margin
+        self.check_interval = check_interval
+        self.tokens: Dict[str, CachedToken] = {}
+        self.inflight: Dict[str, asyncio.Task] = {}
+        # Companies whose stored token must not be reused until a fresh login succeeds
+        self.invalidated: Set[str] = set()
+        self.sweeper: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.reused = 0
+        self.failures = 0
+
+    async def get_token(self, company_id: str) -> str:
+        """Access token for a company, refreshing it first only if it cannot be used"""
+        token = self.tokens.get(company_id)
+        if token is None and company_id not in self.invalidated:
+            token = self._seed(company_id)
+        if token is not None and not token.expires_within(0):
+            if token.expires_within(self.refresh_margin):
+                self._refresh(company_id)
+            return token.access_token
+        # Shielded so one cancelled caller does not cancel the refresh for the others
+        token = await asyncio.shield(self._refresh(company_id))
+        return token.access_token
+
+    def _seed(self, company_id: str) -> Optional[CachedToken]:
+        # The directory was loaded with every company's stored token
+        handle = employee_directory.company(company_id)
+        if handle is None or not handle.access_token:
+            return None
+        token = CachedToken(handle.access_token, handle.token_expiry)
+        self.tokens[company_id] = token
+        return token
+
+    def invalidate(self, company_id: str, rejected: Optional[str] = None) -> None:
+        """Forget a company's token, e.g. after its credentials change.
+
+        The directory and the companies row still hold the old token, so the
+        company is flagged until the next refresh has logged in again
+        instead of seeding or reusing it. A refresh already running may be
+        using the old credentials; it is detached and its token not kept.
+
+        `rejected` is the token GreytHR answered 401 to. If it has already
+        been replaced, or a forced login is already pending, nothing
+        happens, so concurrent 401s for one token cause a single login.
+        """
+        if rejected is not None:
+            current = self.tokens.get(company_id)
+            if company_id in self.invalidated or (current is not None and current.access_token != rejected):
+                return
+        self.tokens.pop(company_id, None)
+        self.invalidated.add(company_id)
+        self.inflight.pop(company_id, None)
+
+    def _refresh(self, company_id: str) -> asyncio.Task:
+        task = self.inflight.get(company_id)
+        if task is None:
+            task = asyncio.ensure_future(self._do_refresh(company_id))
+            self.inflight[company_id] = task
+            task.add_done_callback(lambda done: self._refreshed(company_id, done))
+        return task
+
+    def _refreshed(self, company_id: str, task: asyncio.Task) -> None:
+        if self.inflight.get(company_id) is task:
+            del self.inflight[company_id]
+        # Background refreshes have no awaiter; retrieve the error so it is not reported as lost
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+            logger.error(f"Error refreshing GreytHR token for company {company_id}: {str(task.exception())}")
+
+    async def _do_refresh(self, company_id: str) -> CachedToken:
+        forced = company_id in self.invalidated
+        async with AsyncSessionLocal() as db:
+            # Row lock: only one node refreshes a company at a time
+            result = await db.execute(
+                select(Company).filter(Company.id == company_id).with_for_update()
+            )
+            company = result.scalars().first()
+            if not company:
+                raise Exception(f"Company {company_id} not found")
+
+            stored = CachedToken(company.access_token, company.token_expiry) if company.access_token else None
+            if not forced and stored is not None and not stored.expires_within(self.refresh_margin):
+                # Another node refreshed while this one waited for the lock
+                await db.commit()
+                self.reused += 1
+                employee_directory.update_company_token(company)
+            else:
+                # Stores the new token and commits, which releases the lock
+                await get_and_store_greythr_token(company, db)
+                stored = CachedToken(company.access_token, company.token_expiry)
+                self.refreshes += 1
+                logger.info(f"Refreshed GreytHR token for {company.name}, expires {company.token_expiry}")
+
+        # Only the current refresh may store; one detached by invalidate() just answers its own waiters
+        if self.inflight.get(company_id) is asyncio.current_task():
+            self.tokens[company_id] = stored
+            if forced:
+                self.invalidated.discard(company_id)
+        return stored
+
+    async def start(self) -> None:
+        """Start the background sweep that renews tokens before they expire"""
+        if self.sweeper is None or self.sweeper.done():
+            self.sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self) -> None:
+        if self.sweeper is not None:
+            self.sweeper.cancel()
+            try:
+                await self.sweeper
+            except asyncio.CancelledError:
+                pass
+            self.sweeper = None
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            for company_id, token in list(self.tokens.items()):
+                if token.expires_within(self.refresh_margin + self.check_interval):
+                    self._refresh(company_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cached tokens, refresh counters and time left per company"""
+        now = datetime.utcnow()
+        return {
+            "tokens": len(self.tokens),
+            "inflight": len(self.inflight),
+            "refreshes": self.refreshes,
+            "reused": self.reused,
+            "failures": self.failures,
+            "expires_in_seconds": {
+                company_id: int((token.expires_at - now).total_seconds()) if token.expires_at else None
+                for company_id, token in self.tokens.items()
+            }
+        }
+
+token_manager = GreytHRTokenManager()
@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable, Hashable
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Leave cache settings
+LEAVE_CACHE_TTL = int(os.getenv("LEAVE_CACHE_TTL", "300"))
+LEAVE_CACHE_STALE_TTL = int(os.getenv("LEAVE_CACHE_STALE_TTL", "3600"))
+LEAVE_CACHE_MAX_BYTES = int(os.getenv("LEAVE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+Loader = Callable[[], Awaitable[Any]]
+
+class CacheEntry:
+    __slots__ = ("value", "fetched_at", "size")
+
+    def __init__(self, value: Any, size: int):
+        self.value = value
+        self.fetched_at = time.monotonic()
+        self.size = size
+
+def estimate_size(value: Any) -> int:
+    """Approximate footprint of a GreytHR response by its JSON length"""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+class LeaveCache:
+    """Stale-while-revalidate cache of GreytHR leave responses.
+
+    Keys start with (kind, company_id, employee_id), e.g. balances are
+    ("balance", company_id, employee_id, year) and transactions
+    ("transactions", company_id, employee_id, start, end). Within ttl an
+    entry is served as is; up to stale_ttl beyond that it is still served
+    while one background refresh replaces it. Misses are loaded
+    single-flight. Entries are evicted least recently used once their
+    estimated size passes max_bytes.
+    """
+
+    def __init__(
+        self,
+        ttl: int = LEAVE_CACHE_TTL,
+        stale_ttl: int = LEAVE_CACHE_STALE_TTL,
+        max_bytes: int = LEAVE_CACHE_MAX_BYTES
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self.bytes = 0
+        self.inflight: Dict[Tuple, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.load_errors = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get(self, key: Tuple[Hashable, ...], loader: Loader) -> Any:
+        """Return the cached value for key, calling loader on a miss or in the background when stale"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self.entries.move_to_end(key)
+                self._load(key, loader)
+                return entry.value
+            self._remove(key)
+
+        self.misses += 1
+        # Shielded so one cancelled caller does not cancel the load for the others
+        return await asyncio.shield(self._load(key, loader))
+
+    def _load(self, key: Tuple, loader: Loader) -> asyncio.Task:
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, loader))
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self._loaded(key, done))
+        return task
+
+    def _loaded(self, key: Tuple, task: asyncio.Task) -> None:
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        # Stale refreshes have no awaiter; keep their errors out of "never retrieved" warnings
+        if not task.cancelled() and task.exception() is not None:
+            self.load_errors += 1
+
+    async def _fetch(self, key: Tuple, loader: Loader) -> Any:
+        value = await loader()
+        # Skip the store if the key was invalidated while this load was running
+        if self.inflight.get(key) is asyncio.current_task():
+            self._store(key, value)
+        return value
+
+    def _store(self, key: Tuple, value: Any) -> None:
+        self._remove(key)
+        entry = CacheEntry(value, estimate_size(value))
+        self.entries[key] = entry
+        self.bytes += entry.size
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
+
+    def _remove(self, key: Tuple) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def invalidate_employee(self, company_id: str, employee_id: int) -> int:
+        """Drop every entry for one employee, e.g. after a leave is applied or cancelled"""
+        return self._invalidate(lambda key: key[1] == company_id and key[2] == int(employee_id))
+
+    def purge(self, company_id: Optional[str] = None) -> int:
+        """Drop every entry, or every entry of one company"""
+        if company_id is None:
+            return self._invalidate(lambda key: True)
+        return self._invalidate(lambda key: key[1] == company_id)
+
+    def _invalidate(self, match: Callable[[Tuple], bool]) -> int:
+        keys = [key for key in self.entries if match(key)]
+        for key in keys:
+            self._remove(key)
+        # A load already in flight would store pre-invalidation data; let it finish uncached
+        for key in [key for key in self.inflight if match(key)]:
+            del self.inflight[key]
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self.entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "inflight": len(self.inflight),
+            "load_errors": self.load_errors,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+leave_cache = LeaveCache()
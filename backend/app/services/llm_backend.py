@@ -0,0 +1,384 @@
+import os
+import re
+import time
+import asyncio
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Any, List, AsyncIterator, Optional, Union, Callable
+from app.core.prompts import LLMPrompt
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Ordered fallback chain, e.g. "gemini:gemini-2.0-flash,gemini:gemini-1.5-flash" or "fake"
+LLM_BACKENDS = os.getenv("LLM_BACKENDS", "gemini:gemini-2.0-flash")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+
+# Gemini context cache for the static prompt prefix
+LLM_CONTEXT_CACHE = os.getenv("LLM_CONTEXT_CACHE", "true").lower() in ("1", "true", "yes")
+LLM_CONTEXT_CACHE_TTL = int(os.getenv("LLM_CONTEXT_CACHE_TTL", "3600"))
+LLM_CONTEXT_CACHE_RETRY = float(os.getenv("LLM_CONTEXT_CACHE_RETRY", "600"))
+# Smallest prefix the provider will cache (32768 tokens for the 1.5 and 2.0 models)
+LLM_CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("LLM_CONTEXT_CACHE_MIN_TOKENS", "32768"))
+# Explicit caching needs a stable model version, e.g. gemini-2.0-flash-001
+VERSIONED_MODEL = re.compile(r"-\d{3}$")
+# Re-register this long before the provider drops the cache
+CONTEXT_CACHE_REFRESH_MARGIN = 60
+
+# Fake backend settings
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.5"))
+FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "50"))
+FAKE_LLM_REPLY_TOKENS = int(os.getenv("FAKE_LLM_REPLY_TOKENS", "80"))
+
+# Plain text, or an HR bot prompt whose static prefix a backend may serve from a cache
+Prompt = Union[str, LLMPrompt]
+
+def prompt_text(prompt: Prompt) -> str:
+    """The whole prompt as one string, for backends without a context cache"""
+    return prompt if isinstance(prompt, str) else prompt.text
+
+def is_context_cache_error(error: BaseException) -> bool:
+    """The provider no longer knows the cached content (expired, deleted or not ours)"""
+    return type(error).__name__ in ("NotFound", "PermissionDenied", "FailedPrecondition")
+
+class LLMBackend(ABC):
+    """One text-generation model; `timeout` bounds generate() and each gap between streamed chunks"""
+
+    name: str = "llm"
+
+    def __init__(self, timeout: float = LLM_TIMEOUT):
+        self.timeout = timeout
+
+    @abstractmethod
+    async def generate(self, prompt: Prompt) -> str:
+        """Full reply text for a prompt"""
+
+    @abstractmethod
+    def stream(self, prompt: Prompt) -> AsyncIterator[str]:
+        """Reply text in pieces as they are produced"""
+
+    @abstractmethod
+    async def count_tokens(self, prompt: Prompt) -> int:
+        """Input tokens the prompt costs on this backend"""
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend-specific counters, if any"""
+        return {}
+
+class GeminiContextCache:
+    """The static prompt prefix registered once with Gemini's context cache.
+
+    Registration runs in the background on first use and callers send plain
+    prompts until it has finished. It is never attempted when the model
+    name has no version suffix or the prefix is below min_tokens (estimated
+    at 4 characters per token), since the provider rejects both; that is
+    logged once. If registration fails anyway, e.g. the SDK has no caching
+    support, plain prompts are used for LLM_CONTEXT_CACHE_RETRY seconds
+    before the next attempt. The cache is registered again shortly before its TTL runs out;
+    the old one expires on the provider's side.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        ttl: int = LLM_CONTEXT_CACHE_TTL,
+        retry_after: float = LLM_CONTEXT_CACHE_RETRY,
+        min_tokens: int = LLM_CONTEXT_CACHE_MIN_TOKENS
+    ):
+        self.model_name = model_name
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.min_tokens = min_tokens
+        # Last prefix checked for cacheability, and why it cannot be cached
+        self.checked_prefix: Optional[str] = None
+        self.skip_reason: Optional[str] = None
+        self.prefix: Optional[str] = None
+        # GenerativeModel bound to the cached content
+        self.model = None
+        self.expires_at = 0.0
+        self.retry_at = 0.0
+        self.registering: Optional[asyncio.Task] = None
+        self.registrations = 0
+        self.failures = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, prefix: str):
+        """Model serving `prefix` from the cache, or None to send a plain prompt"""
+        if prefix != self.checked_prefix:
+            self.checked_prefix = prefix
+            self.skip_reason = self._skip_reason(prefix)
+            if self.skip_reason:
+                logger.info(f"Gemini context cache not used for {self.model_name}: {self.skip_reason}")
+        if self.skip_reason:
+            self.misses += 1
+            return None
+
+        now = time.monotonic()
+        current = self.model is not None and self.prefix == prefix
+        if (not current or now >= self.expires_at - CONTEXT_CACHE_REFRESH_MARGIN) \
+                and self.registering is None and now >= self.retry_at:
+            self.registering = asyncio.ensure_future(self._register(prefix))
+        if current and now < self.expires_at:
+            self.hits += 1
+            return self.model
+        self.misses += 1
+        return None
+
+    def _skip_reason(self, prefix: str) -> Optional[str]:
+        if not VERSIONED_MODEL.search(self.model_name):
+            return "explicit caching needs a versioned model name such as gemini-2.0-flash-001"
+        tokens = len(prefix) // 4
+        if tokens < self.min_tokens:
+            return f"prompt prefix is about {tokens} tokens, below the {self.min_tokens} token minimum"
+        return None
+
+    async def _register(self, prefix: str) -> None:
+        try:
+            import google.generativeai as genai
+            from google.generativeai import caching
+
+            # The SDK call is blocking, so it runs in a thread
+            cached = await asyncio.to_thread(
+                caching.CachedContent.create,
+                model=self.model_name,
+                display_name="hrbot-prompt-prefix",
+                system_instruction=prefix,
+                ttl=timedelta(seconds=self.ttl)
+            )
+            self.model = genai.GenerativeModel.from_cached_content(cached_content=cached)
+            self.prefix = prefix
+            self.expires_at = time.monotonic() + self.ttl
+            self.registrations += 1
+            logger.info(f"Registered prompt prefix in Gemini context cache {cached.name} for {self.model_name}")
+        except Exception as e:
+            self.failures += 1
+            self.retry_at = time.monotonic() + self.retry_after
+            logger.warning(f"Gemini context cache unavailable for {self.model_name}, sending plain prompts: {str(e)}")
+        finally:
+            self.registering = None
+
+    def invalidate(self) -> None:
+        self.model = None
+        self.prefix = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.model is not None and time.monotonic() < self.expires_at,
+            "skipped": self.skip_reason,
+            "hits": self.hits,
+            "misses": self.misses,
+            "registrations": self.registrations,
+            "failures": self.failures
+        }
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini through google-generativeai's async API (genai.configure must have run).
+
+    With a context cache, LLMPrompts send only their dynamic part against the
+    cached prefix; if the provider has dropped the cache the call is made
+    again as a plain prompt.
+    """
+
+    def __init__(self, model_name: str, timeout: float = LLM_TIMEOUT, context_cache: bool = LLM_CONTEXT_CACHE):
+        super().__init__(timeout)
+        # Imported here so the fake backend works without the Gemini SDK installed
+        import google.generativeai as genai
+
+        self.name = f"gemini:{model_name}"
+        self.model = genai.GenerativeModel(model_name)
+        self.context_cache = GeminiContextCache(model_name) if context_cache else None
+
+    async def _start(self, prompt: Prompt, stream: bool = False):
+        """Send the prompt, through the context cache when it is available"""
+        cached_model = None
+        if isinstance(prompt, LLMPrompt) and self.context_cache is not None:
+            cached_model = self.context_cache.get(prompt.cache_prefix)
+        if cached_model is not None:
+            try:
+                return await cached_model.generate_content_async(prompt.dynamic, stream=stream)
+            except Exception as e:
+                if not is_context_cache_error(e):
+                    raise
+                logger.warning(f"Gemini context cache lost ({str(e)}), resending as a plain prompt")
+                self.context_cache.invalidate()
+        return await self.model.generate_content_async(prompt_text(prompt), stream=stream)
+
+    async def generate(self, prompt: Prompt) -> str:
+        response = await self._start(prompt)
+        return response.text
+
+    async def stream(self, prompt: Prompt) -> AsyncIterator[str]:
+        response = await self._start(prompt, stream=True)
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts, e.g. only safety ratings
+                continue
+            if text:
+                yield text
+
+    async def count_tokens(self, prompt: Prompt) -> int:
+        response = await self.model.count_tokens_async(prompt_text(prompt))
+        return response.total_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        return {"context_cache": self.context_cache.stats()} if self.context_cache is not None else {}
+
+class FakeBackend(LLMBackend):
+    """Deterministic offline model for benchmarks and CI.
+
+    Waits `latency` before the first token, then produces `reply_tokens`
+    words at `tokens_per_second`. The reply depends only on the prompt, so
+    runs are repeatable. Tokens are counted as 4 characters each.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: float = FAKE_LLM_LATENCY,
+        tokens_per_second: float = FAKE_LLM_TOKENS_PER_SECOND,
+        reply_tokens: int = FAKE_LLM_REPLY_TOKENS,
+        timeout: float = LLM_TIMEOUT,
+        chunk_tokens: int = 8
+    ):
+        super().__init__(timeout)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.chunk_tokens = chunk_tokens
+
+    def _words(self, prompt: str) -> List[str]:
+        digest = hashlib.sha1(prompt.encode()).hexdigest()
+        return [f"{digest[i % 32:i % 32 + 6]}" for i in range(self.reply_tokens)]
+
+    async def generate(self, prompt: Prompt) -> str:
+        return "".join([text async for text in self.stream(prompt)])
+
+    async def stream(self, prompt: Prompt) -> AsyncIterator[str]:
+        await asyncio.sleep(self.latency)
+        words = self._words(prompt_text(prompt))
+        for start in range(0, len(words), self.chunk_tokens):
+            chunk = words[start:start + self.chunk_tokens]
+            if start:
+                await asyncio.sleep(len(chunk) / self.tokens_per_second)
+            yield " ".join(chunk) + " "
+
+    async def count_tokens(self, prompt: Prompt) -> int:
+        return max(1, len(prompt_text(prompt)) // 4)
+
+def create_llm_backend(spec: str, timeout: float = LLM_TIMEOUT) -> LLMBackend:
+    """Backend for one LLM_BACKENDS entry: "gemini:<model>" or "fake\""""
+    kind, _, arg = spec.strip().partition(":")
+    if kind == "gemini":
+        return GeminiBackend(arg or "gemini-2.0-flash", timeout)
+    if kind == "fake":
+        return FakeBackend(timeout=timeout)
+    raise ValueError(f"Unknown LLM backend: {spec}")
+
+class LLMFallbackChain(LLMBackend):
+    """Try backends in order, moving on when one errors or runs past its timeout.
+
+    A stream can only fail over before its first chunk; once text has been
+    shown to the user a later failure is raised to the caller. Errors that
+    a fallback absorbs never reach the caller, so they are passed to
+    `on_fallback_error` (e.g. the concurrency limiter, which must still see
+    the primary's 429s).
+    """
+
+    name = "chain"
+
+    def __init__(
+        self,
+        backends: List[LLMBackend],
+        on_fallback_error: Optional[Callable[[BaseException], None]] = None
+    ):
+        super().__init__(max(backend.timeout for backend in backends))
+        self.backends = backends
+        self.on_fallback_error = on_fallback_error
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.failures: Dict[str, int] = defaultdict(int)
+        self.timeouts: Dict[str, int] = defaultdict(int)
+        self.fallbacks = 0
+
+    def _failed(self, backend: LLMBackend, error: BaseException, is_last: bool) -> None:
+        if isinstance(error, asyncio.TimeoutError):
+            self.timeouts[backend.name] += 1
+        else:
+            self.failures[backend.name] += 1
+        if not is_last:
+            self.fallbacks += 1
+            logger.warning(f"LLM backend {backend.name} failed ({type(error).__name__}: {str(error)}), falling back")
+            if self.on_fallback_error is not None:
+                self.on_fallback_error(error)
+
+    async def generate(self, prompt: Prompt) -> str:
+        last_error: Optional[BaseException] = None
+        for index, backend in enumerate(self.backends):
+            self.calls[backend.name] += 1
+            try:
+                return await asyncio.wait_for(backend.generate(prompt), backend.timeout)
+            except Exception as e:
+                self._failed(backend, e, index == len(self.backends) - 1)
+                last_error = e
+        raise last_error
+
+    async def stream(self, prompt: Prompt) -> AsyncIterator[str]:
+        last_error: Optional[BaseException] = None
+        for index, backend in enumerate(self.backends):
+            self.calls[backend.name] += 1
+            chunks = backend.stream(prompt).__aiter__()
+            started = False
+            try:
+                while True:
+                    try:
+                        text = await asyncio.wait_for(chunks.__anext__(), backend.timeout)
+                    except StopAsyncIteration:
+                        return
+                    started = True
+                    yield text
+            except Exception as e:
+                if started:
+                    raise
+                self._failed(backend, e, index == len(self.backends) - 1)
+                last_error = e
+            finally:
+                await chunks.aclose()
+        raise last_error
+
+    async def count_tokens(self, prompt: Prompt) -> int:
+        last_error: Optional[BaseException] = None
+        for backend in self.backends:
+            try:
+                return await asyncio.wait_for(backend.count_tokens(prompt), backend.timeout)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls, failures and timeouts per backend, plus each backend's own counters"""
+        return {
+            "backends": [backend.name for backend in self.backends],
+            "fallbacks": self.fallbacks,
+            "calls": dict(self.calls),
+            "failures": dict(self.failures),
+            "timeouts": dict(self.timeouts),
+            **{backend.name: backend.stats() for backend in self.backends if backend.stats()}
+        }
+
+def build_llm_chain(
+    specs: str = LLM_BACKENDS,
+    timeout: float = LLM_TIMEOUT,
+    on_fallback_error: Optional[Callable[[BaseException], None]] = None
+) -> LLMFallbackChain:
+    """Fallback chain from a comma-separated LLM_BACKENDS value"""
+    return LLMFallbackChain(
+        [create_llm_backend(spec, timeout) for spec in specs.split(",") if spec.strip()],
+        on_fallback_error
+    )
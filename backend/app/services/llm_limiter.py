@@ -0,0 +1,163 @@
+import os
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, AsyncIterator
+from app.services.slack_scheduler import PriorityGate
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# LLM concurrency settings
+LLM_CONCURRENCY_INITIAL = int(os.getenv("LLM_CONCURRENCY_INITIAL", "8"))
+LLM_CONCURRENCY_MIN = int(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+LLM_CONCURRENCY_MAX = int(os.getenv("LLM_CONCURRENCY_MAX", "32"))
+LLM_QUEUE_MAX = int(os.getenv("LLM_QUEUE_MAX", "200"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "30"))
+LLM_LATENCY_TARGET = float(os.getenv("LLM_LATENCY_TARGET", "10"))
+LLM_BACKOFF_FACTOR = float(os.getenv("LLM_BACKOFF_FACTOR", "0.5"))
+LLM_DECREASE_COOLDOWN = float(os.getenv("LLM_DECREASE_COOLDOWN", "2"))
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+class LLMOverloadedError(Exception):
+    """The LLM queue is full or the wait for a slot ran out"""
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Provider 429s (google.api_core ResourceExhausted/TooManyRequests carry code 429)"""
+    return getattr(error, "code", None) == 429 or type(error).__name__ in ("ResourceExhausted", "TooManyRequests")
+
+class LLMCall:
+    """Timing for one call holding a slot; streams mark their first chunk as the latency"""
+    __slots__ = ("started", "latency")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latency: Optional[float] = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def first_response(self) -> None:
+        if self.latency is None:
+            self.latency = self.elapsed()
+
+class AdaptiveConcurrencyLimiter(PriorityGate):
+    """AIMD concurrency limit for LLM calls.
+
+    Each call that finishes within the latency target adds 1/limit to the
+    limit (about +1 per round of calls); a provider 429 or a call slower
+    than the target multiplies it by the backoff factor, at most once per
+    cooldown so one burst of slow calls counts once. Calls beyond the
+    limit wait in priority order; when max_queue are already waiting, or
+    the wait passes queue_timeout, the call is rejected.
+    """
+
+    def __init__(
+        self,
+        initial: int = LLM_CONCURRENCY_INITIAL,
+        minimum: int = LLM_CONCURRENCY_MIN,
+        maximum: int = LLM_CONCURRENCY_MAX,
+        max_queue: int = LLM_QUEUE_MAX,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT,
+        latency_target: float = LLM_LATENCY_TARGET
+    ):
+        super().__init__()
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.inflight = 0
+        self.last_decrease = 0.0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.rate_limited = 0
+        self.slow = 0
+        self.decreases = 0
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE) -> None:
+        if self.inflight < int(self.limit) and not self.queued:
+            self.inflight += 1
+            return
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise LLMOverloadedError("LLM queue is full")
+
+        future = self._enqueue(priority)
+        try:
+            # The slot is handed over by release() with inflight already counted
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise LLMOverloadedError(f"No LLM slot within {self.queue_timeout}s")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self, latency: Optional[float] = None, rate_limited: bool = False) -> None:
+        """Free a slot and adjust the limit from how the call went (None = no signal)"""
+        if rate_limited:
+            self.rate_limited += 1
+            self._decrease("provider rate limit")
+        elif latency is not None and latency > self.latency_target:
+            self.slow += 1
+            self._decrease(f"latency {latency:.1f}s over target")
+        elif latency is not None:
+            self.completed += 1
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+        self.inflight -= 1
+        while self.inflight < int(self.limit) and self._grant_next():
+            self.inflight += 1
+
+    def record_error(self, error: BaseException) -> None:
+        """Count a provider 429 the caller never saw, e.g. one absorbed by a fallback backend"""
+        if is_rate_limit_error(error):
+            self.rate_limited += 1
+            self._decrease("provider rate limit")
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self.last_decrease < LLM_DECREASE_COOLDOWN:
+            return
+        self.last_decrease = now
+        self.decreases += 1
+        self.limit = max(self.minimum, self.limit * LLM_BACKOFF_FACTOR)
+        logger.warning(f"LLM concurrency limit lowered to {int(self.limit)} ({reason})")
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_INTERACTIVE) -> AsyncIterator[LLMCall]:
+        """Hold a slot for the body; the body reports its latency through the yielded LLMCall"""
+        await self.acquire(priority)
+        call = LLMCall()
+        try:
+            yield call
+        except BaseException as e:
+            self.release(None, rate_limited=is_rate_limit_error(e))
+            raise
+        else:
+            self.release(call.latency if call.latency is not None else call.elapsed())
+
+    def stats(self) -> Dict[str, Any]:
+        """In-flight, queued and rejected counts plus the current limit"""
+        return {
+            "limit": int(self.limit),
+            "inflight": self.inflight,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "completed": self.completed,
+            "rate_limited": self.rate_limited,
+            "slow": self.slow,
+            "decreases": self.decreases
+        }
+
+llm_limiter = AdaptiveConcurrencyLimiter()
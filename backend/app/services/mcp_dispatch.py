@@ -0,0 +1,90 @@
+import os
+import logging
+import aiohttp
+from typing import Dict, Any, Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Leave unset when the MCP router runs in this process; set it
+# (e.g. http://mcp-host:8000/api/v1/mcp) to forward over HTTP instead
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "").rstrip("/")
+MCP_HTTP_POOL_SIZE = int(os.getenv("MCP_HTTP_POOL_SIZE", "20"))
+MCP_HTTP_TIMEOUT = float(os.getenv("MCP_HTTP_TIMEOUT", "60"))
+
+class MCPDispatcher:
+    """Deliver Slack payloads to the MCP handlers.
+
+    Co-located: call the route functions directly, skipping the loopback
+    TCP connection, JSON round trip and extra uvicorn request.
+    Remote: POST over one persistent pooled session.
+    """
+
+    def __init__(self, server_url: str = MCP_SERVER_URL):
+        self.server_url = server_url
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def is_remote(self) -> bool:
+        return bool(self.server_url)
+
+    async def dispatch(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        leave_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Send a payload to an MCP endpoint; leave_context is only used in-process"""
+        if self.is_remote:
+            return await self._post(endpoint, payload)
+        return await self._call_local(endpoint, payload, leave_context)
+
+    async def prefetch_leave_context(self, user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Start the employee/leave lookup early; a remote MCP server does its own"""
+        if self.is_remote:
+            return None
+        # Imported here so the Slack router does not import the MCP module until it is needed
+        from app.api.endpoints import mcp
+        return await mcp.get_leave_context(user)
+
+    async def _call_local(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        leave_context: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        from app.api.endpoints import mcp
+
+        handlers = {
+            "on_tagged_in_channel": mcp.answer_channel_mention,
+            "on_dm_personally": mcp.answer_direct_message
+        }
+        handler = handlers.get(endpoint)
+        if handler is None:
+            raise ValueError(f"Unknown MCP endpoint: {endpoint}")
+
+        response = await handler(mcp.MCPRequest.model_validate(payload), leave_context)
+        return response.model_dump()
+
+    async def _post(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=MCP_HTTP_POOL_SIZE),
+                timeout=aiohttp.ClientTimeout(total=MCP_HTTP_TIMEOUT)
+            )
+        async with self.session.post(f"{self.server_url}/{endpoint}", json=payload) as r:
+            r.raise_for_status()
+            return await r.json()
+
+    async def close(self) -> None:
+        """Close the pooled session on shutdown"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+mcp_dispatcher = MCPDispatcher()
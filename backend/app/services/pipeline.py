@@ -0,0 +1,85 @@
+import time
+import asyncio
+import logging
+from typing import Dict, Any, Callable, Awaitable, Sequence, List, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+StageFunc = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+class StagePipeline:
+    """Run named async stages as soon as the stages they depend on finish.
+
+    Each stage function receives the results dict (stage name -> result)
+    and may read the results of its dependencies from it. Independent
+    stages run concurrently. Stages must be added after their
+    dependencies, which keeps the graph acyclic. Per-stage timings and the
+    critical path are logged once the run finishes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages: Dict[str, Tuple[StageFunc, Tuple[str, ...]]] = {}
+        self.timings: Dict[str, Tuple[float, float]] = {}
+
+    def stage(self, name: str, func: StageFunc, deps: Sequence[str] = ()) -> "StagePipeline":
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self.stages[name] = (func, tuple(deps))
+        return self
+
+    async def run(self) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        started = time.perf_counter()
+        self.timings = {}
+
+        async def run_stage(name: str, func: StageFunc, deps: Tuple[str, ...]) -> Any:
+            if deps:
+                await asyncio.gather(*(tasks[dep] for dep in deps))
+            stage_start = time.perf_counter() - started
+            try:
+                results[name] = await func(results)
+            finally:
+                self.timings[name] = (stage_start, time.perf_counter() - started)
+            return results[name]
+
+        for name, (func, deps) in self.stages.items():
+            tasks[name] = asyncio.ensure_future(run_stage(name, func, deps))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        finally:
+            self.log_timings(time.perf_counter() - started)
+        return results
+
+    def critical_path(self) -> List[str]:
+        """Walk back from the last stage to finish through the dependency that finished last"""
+        if not self.timings:
+            return []
+        current = max(self.timings, key=lambda name: self.timings[name][1])
+        path = [current]
+        while True:
+            deps = [dep for dep in self.stages[current][1] if dep in self.timings]
+            if not deps:
+                break
+            current = max(deps, key=lambda name: self.timings[name][1])
+            path.append(current)
+        return list(reversed(path))
+
+    def log_timings(self, total: float) -> None:
+        stages = ", ".join(
+            f"{name} {start * 1000:.0f}-{end * 1000:.0f}ms"
+            for name, (start, end) in sorted(self.timings.items(), key=lambda item: item[1][0])
+        )
+        logger.info(
+            f"Pipeline {self.name} took {total * 1000:.0f}ms [{stages}] "
+            f"critical path: {' -> '.join(self.critical_path())}"
+        )
@@ -0,0 +1,162 @@
+import os
+import re
+import time
+import logging
+import numpy as np
+from collections import deque
+from typing import Dict, Any, List
+from app.core.prompts import LEAVE_POLICY
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Policy retrieval settings
+POLICY_TOP_K = int(os.getenv("POLICY_TOP_K", "3"))
+POLICY_TOKEN_BUDGET = int(os.getenv("POLICY_TOKEN_BUDGET", "600"))
+# Sections scoring below this fraction of the best match are left out
+POLICY_MIN_RELATIVE_SCORE = float(os.getenv("POLICY_MIN_RELATIVE_SCORE", "0.5"))
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# A short title line ending in ":" or ": -" starts a new section
+SECTION_HEADING = re.compile(r"^([A-Z][A-Za-z ]{2,40}?)\s*:\s*-?\s*$")
+WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from get has have he her him his how i if in is it its "
+    "many me much my need of on or our she take that the their them they this to was we what when "
+    "which will with would you your".split()
+)
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)"""
+    return max(1, len(text) // 4)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words without stopwords, with a plural "s" stripped (leaves -> leave, ELs -> el)"""
+    terms = []
+    for word in WORD.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 2 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+class PolicySection:
+    """One titled section of the leave policy"""
+    __slots__ = ("title", "text", "tokens")
+
+    def __init__(self, title: str, text: str):
+        self.title = title
+        self.text = text
+        self.tokens = estimate_tokens(text)
+
+    def __repr__(self):
+        return f"<PolicySection(title='{self.title}', tokens={self.tokens})>"
+
+def split_sections(policy: str, first_title: str = "General Leave Rules") -> List[PolicySection]:
+    """Split the policy text at its section headings; text before the first heading is `first_title`"""
+    sections: List[PolicySection] = []
+    title, lines = first_title, []
+    for line in policy.splitlines():
+        heading = SECTION_HEADING.match(line.strip())
+        if heading:
+            if lines:
+                sections.append(PolicySection(title, "\n".join(lines)))
+            title, lines = heading.group(1), [line]
+        else:
+            lines.append(line)
+    if lines:
+        sections.append(PolicySection(title, "\n".join(lines)))
+    return sections
+
+class PolicyIndex:
+    """BM25 index over the policy sections.
+
+    The per-section term weights are computed once into a dense
+    (sections x vocabulary) matrix, so scoring a question is a column
+    gather and a row sum. search() returns up to top_k sections scoring at
+    least min_relative_score of the best match whose combined size fits
+    the token budget, in policy order.
+    """
+
+    def __init__(self, sections: List[PolicySection]):
+        self.sections = sections
+        self.vocabulary: Dict[str, int] = {}
+        documents = [tokenize(f"{section.title}\n{section.text}") for section in sections]
+        for terms in documents:
+            for term in terms:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        counts = np.zeros((len(sections), len(self.vocabulary)), dtype=np.float32)
+        for row, terms in enumerate(documents):
+            np.add.at(counts[row], [self.vocabulary[term] for term in terms], 1)
+
+        lengths = counts.sum(axis=1, keepdims=True)
+        document_frequency = (counts > 0).sum(axis=0)
+        idf = np.log(1 + (len(sections) - document_frequency + 0.5) / (document_frequency + 0.5))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / lengths.mean())
+        self.weights = (idf * counts * (BM25_K1 + 1) / (counts + norm)).astype(np.float32)
+        self.latencies: deque = deque(maxlen=500)
+        self.searches = 0
+
+    @classmethod
+    def from_text(cls, policy: str) -> "PolicyIndex":
+        return cls(split_sections(policy))
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every section for the query"""
+        columns = [self.vocabulary[term] for term in set(tokenize(query)) if term in self.vocabulary]
+        if not columns:
+            return np.zeros(len(self.sections), dtype=np.float32)
+        return self.weights[:, columns].sum(axis=1)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = POLICY_TOP_K,
+        token_budget: int = POLICY_TOKEN_BUDGET,
+        min_relative_score: float = POLICY_MIN_RELATIVE_SCORE
+    ) -> List[PolicySection]:
+        """Most relevant sections for the query within the token budget"""
+        started = time.perf_counter()
+        scores = self.scores(query)
+        cutoff = max(float(scores.max()) * min_relative_score, 1e-9)
+        chosen: List[int] = []
+        used = 0
+        for row in np.argsort(-scores, kind="stable"):
+            if len(chosen) >= top_k or scores[row] < cutoff:
+                break
+            # A section that does not fit is skipped so a smaller, lower-ranked one still can
+            if used + self.sections[row].tokens <= token_budget:
+                chosen.append(int(row))
+                used += self.sections[row].tokens
+        self.searches += 1
+        self.latencies.append(time.perf_counter() - started)
+        return [self.sections[row] for row in sorted(chosen)]
+
+    def relevant_policy(self, query: str, **kwargs) -> str:
+        """Policy text to put in a prompt for the query"""
+        sections = self.search(query, **kwargs)
+        if not sections:
+            return "(No policy section matched this question; rely on the policy summary.)"
+        return "\n\n".join(section.text for section in sections)
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and search latency"""
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else None
+        return {
+            "sections": len(self.sections),
+            "vocabulary": len(self.vocabulary),
+            "policy_tokens": sum(section.tokens for section in self.sections),
+            "searches": self.searches,
+            "p95_us": round(p95 * 1e6, 1) if p95 is not None else None
+        }
+
+# Built once at import, before the first message
+policy_index = PolicyIndex.from_text(LEAVE_POLICY)
+logger.info(f"Leave policy indexed: {policy_index.stats()}")
@@ -0,0 +1,55 @@
+import os
+import logging
+import aiohttp
+from slack_sdk.web.async_client import AsyncWebClient
+from app.services.slack_scheduler import SlackRequestScheduler
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Connection pool settings for the Slack Web API
+SLACK_HTTP_POOL_SIZE = int(os.getenv("SLACK_HTTP_POOL_SIZE", "50"))
+SLACK_HTTP_TIMEOUT = int(os.getenv("SLACK_HTTP_TIMEOUT", "10"))
+SLACK_HTTP_CONNECT_TIMEOUT = float(os.getenv("SLACK_HTTP_CONNECT_TIMEOUT", "3"))
+SLACK_HTTP_KEEPALIVE = float(os.getenv("SLACK_HTTP_KEEPALIVE", "30"))
+
+# Raw async client. Until init_slack_client() attaches the pooled session,
+# slack_sdk falls back to a short-lived session per call.
+slack_web_client = AsyncWebClient(
+    token=os.getenv("SLACK_BOT_TOKEN"),
+    timeout=SLACK_HTTP_TIMEOUT
+)
+
+# Shared client used by both the event and MCP paths; every call goes
+# through the rate-limit scheduler
+slack_client = SlackRequestScheduler(slack_web_client)
+
+async def init_slack_client(
+    pool_size: int = SLACK_HTTP_POOL_SIZE,
+    timeout: int = SLACK_HTTP_TIMEOUT,
+    connect_timeout: float = SLACK_HTTP_CONNECT_TIMEOUT
+) -> None:
+    """Attach a keep-alive connection pool to the shared Slack client"""
+    if slack_web_client.session is not None and not slack_web_client.session.closed:
+        return
+    connector = aiohttp.TCPConnector(
+        limit=pool_size,
+        keepalive_timeout=SLACK_HTTP_KEEPALIVE,
+        ttl_dns_cache=300
+    )
+    slack_web_client.session = aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+    )
+    logger.info(f"Slack client connection pool ready (size {pool_size})")
+
+async def close_slack_client() -> None:
+    """Close the pooled session on shutdown"""
+    if slack_web_client.session is not None:
+        await slack_web_client.session.close()
+        slack_web_client.session = None
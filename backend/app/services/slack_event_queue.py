@@ -0,0 +1,120 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Any, Callable, Awaitable, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Ack-first mode settings
+SLACK_EVENT_ACK_FIRST = os.getenv("SLACK_EVENT_ACK_FIRST", "true").lower() in ("1", "true", "yes")
+SLACK_EVENT_WORKERS = int(os.getenv("SLACK_EVENT_WORKERS", "4"))
+SLACK_EVENT_QUEUE_SIZE = int(os.getenv("SLACK_EVENT_QUEUE_SIZE", "1000"))
+SLACK_EVENT_SHUTDOWN_TIMEOUT = float(os.getenv("SLACK_EVENT_SHUTDOWN_TIMEOUT", "25"))
+
+EventHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+class SlackEventWorkerPool:
+    """Bounded asyncio work queue drained by a fixed pool of workers.
+
+    The Slack endpoint only validates, de-duplicates and enqueues; the
+    workers run the slow part (Slack lookups, MCP, LLM) after the 200 has
+    already been sent back to Slack.
+    """
+
+    def __init__(
+        self,
+        handler: EventHandler,
+        num_workers: int = SLACK_EVENT_WORKERS,
+        max_queue_size: int = SLACK_EVENT_QUEUE_SIZE
+    ):
+        self.handler = handler
+        self.num_workers = max(1, num_workers)
+        self.max_queue_size = max_queue_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+        self.busy_workers = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.busy_time = 0.0
+        self.started_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self.workers)
+
+    async def start(self) -> None:
+        """Create the queue and spawn the workers on the running loop"""
+        if self.running:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.started_at = time.monotonic()
+        self.workers = [
+            asyncio.create_task(self._worker(i), name=f"slack-event-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+        logger.info(f"Started {self.num_workers} Slack event workers (queue size {self.max_queue_size})")
+
+    def enqueue(self, event: Dict[str, Any]) -> bool:
+        """Put an event on the queue without waiting. Returns False if the queue is full."""
+        if not self.running:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning(f"Slack event queue full ({self.max_queue_size}), rejecting event")
+            return False
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            event = await self.queue.get()
+            self.busy_workers += 1
+            started = time.monotonic()
+            try:
+                await self.handler(event)
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Worker {index} failed to process Slack event: {str(e)}")
+            finally:
+                self.busy_time += time.monotonic() - started
+                self.busy_workers -= 1
+                self.queue.task_done()
+
+    async def shutdown(self, timeout: float = SLACK_EVENT_SHUTDOWN_TIMEOUT) -> None:
+        """Stop accepting work, drain what is queued (up to timeout), then stop the workers"""
+        if not self.running:
+            return
+        workers, self.workers = self.workers, []
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out draining Slack event queue, {self.queue.qsize()} events dropped")
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        logger.info("Slack event workers stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and worker utilization snapshot"""
+        uptime = time.monotonic() - self.started_at if self.started_at else 0.0
+        capacity = uptime * self.num_workers
+        return {
+            "running": self.running,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "max_queue_size": self.max_queue_size,
+            "workers": self.num_workers,
+            "busy_workers": self.busy_workers,
+            "utilization": self.busy_workers / self.num_workers,
+            "average_utilization": (self.busy_time / capacity) if capacity else 0.0,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
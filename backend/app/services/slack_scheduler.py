@@ -0,0 +1,236 @@
+import os
+import time
+import heapq
+import random
+import asyncio
+import logging
+import itertools
+from collections import defaultdict
+from typing import Dict, Any, Optional, List, Tuple
+from slack_sdk.errors import SlackApiError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Scheduler settings
+SLACK_MAX_INFLIGHT = int(os.getenv("SLACK_MAX_INFLIGHT", "50"))
+SLACK_RATE_LIMIT_MAX_RETRIES = int(os.getenv("SLACK_RATE_LIMIT_MAX_RETRIES", "3"))
+SLACK_RATE_LIMIT_JITTER = float(os.getenv("SLACK_RATE_LIMIT_JITTER", "1.0"))
+SLACK_MAX_BUCKETS = int(os.getenv("SLACK_MAX_BUCKETS", "1000"))
+
+# Lower value = served first
+PRIORITY_USER_VISIBLE = 0
+PRIORITY_CONTEXT = 5
+PRIORITY_ENRICHMENT = 10
+
+# Requests per minute for Slack's documented tiers
+TIER_1 = 1
+TIER_2 = 20
+TIER_3 = 50
+TIER_4 = 100
+
+# Slack method -> (requests per minute, default priority)
+METHOD_LIMITS: Dict[str, Tuple[float, int]] = {
+    "chat.postMessage": (60, PRIORITY_USER_VISIBLE),  # special tier: ~1 per second per channel
+    "chat.update": (TIER_3, PRIORITY_USER_VISIBLE),
+    "conversations.history": (TIER_3, PRIORITY_CONTEXT),
+    "conversations.replies": (TIER_3, PRIORITY_CONTEXT),
+    "conversations.info": (TIER_3, PRIORITY_CONTEXT),
+    "conversations.members": (TIER_4, PRIORITY_CONTEXT),
+    "users.info": (TIER_4, PRIORITY_ENRICHMENT),
+    "users.list": (TIER_2, PRIORITY_ENRICHMENT),
+    "auth.test": (TIER_4, PRIORITY_CONTEXT)
+}
+DEFAULT_LIMIT = (TIER_3, PRIORITY_CONTEXT)
+
+# Methods whose limit applies per channel rather than per workspace
+PER_CHANNEL_METHODS = ("chat.postMessage", "chat.update")
+
+class PriorityGate:
+    """Hands out permits to waiters in priority order (FIFO within a priority)"""
+
+    def __init__(self):
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self.sequence = itertools.count()
+
+    def _enqueue(self, priority: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.sequence), future))
+        return future
+
+    def _grant_next(self) -> bool:
+        while self.waiters:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                future.set_result(None)
+                return True
+        return False
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self.waiters if not future.done())
+
+class TokenBucket(PriorityGate):
+    """Per-method token bucket that can also be blocked for a Retry-After period"""
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        super().__init__()
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, per_minute / 10.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def block(self, seconds: float) -> None:
+        """Stop granting tokens until Retry-After has passed"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    async def acquire(self, priority: int) -> None:
+        future = self._enqueue(priority)
+        self._dispatch()
+        await future
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        while self.tokens >= 1 and now >= self.blocked_until and self._grant_next():
+            self.tokens -= 1
+
+        if self.queued and self.timer is None:
+            delay = max(self.blocked_until - now, (1 - self.tokens) / self.rate, 0.001)
+            self.timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self.timer = None
+        self._dispatch()
+
+class InflightLimiter(PriorityGate):
+    """Caps concurrent Slack requests; when full, user-visible calls get the next free slot"""
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+        self.inflight = 0
+
+    async def acquire(self, priority: int) -> None:
+        if self.inflight < self.limit and not self.queued:
+            self.inflight += 1
+            return
+        future = self._enqueue(priority)
+        try:
+            # The permit is handed over by release() without decrementing
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        if not self._grant_next():
+            self.inflight -= 1
+
+class SlackRequestScheduler:
+    """Rate-limit-aware front for an AsyncWebClient.
+
+    Attribute access mirrors the client (`await scheduler.users_info(user=...)`),
+    but every call first waits for a token from its method's tier bucket and
+    for an in-flight slot, both handed out by priority. 429 responses block
+    the bucket for Retry-After and the call is retried with jitter.
+    """
+
+    def __init__(self, client, max_inflight: int = SLACK_MAX_INFLIGHT, max_retries: int = SLACK_RATE_LIMIT_MAX_RETRIES):
+        self.client = client
+        self.max_retries = max_retries
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.inflight = InflightLimiter(max_inflight)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.throttled: Dict[str, int] = defaultdict(int)
+        self.throttle_wait: Dict[str, float] = defaultdict(float)
+        self.rate_limited: Dict[str, int] = defaultdict(int)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.client, name)
+        if not callable(attr) or name.startswith("_") or "_" not in name:
+            return attr
+
+        async def scheduled(*args, priority: Optional[int] = None, **kwargs):
+            return await self.call(name, *args, priority=priority, **kwargs)
+
+        return scheduled
+
+    def _bucket(self, api_method: str, kwargs: Dict[str, Any]) -> TokenBucket:
+        key = api_method
+        if api_method in PER_CHANNEL_METHODS and kwargs.get("channel"):
+            key = f"{api_method}:{kwargs['channel']}"
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= SLACK_MAX_BUCKETS:
+                self._prune_buckets()
+            per_minute, _ = METHOD_LIMITS.get(api_method, DEFAULT_LIMIT)
+            bucket = TokenBucket(per_minute)
+            self.buckets[key] = bucket
+        return bucket
+
+    def _prune_buckets(self) -> None:
+        """Drop idle per-channel buckets; an idle bucket is full again so nothing is lost"""
+        for key, bucket in list(self.buckets.items()):
+            if ":" in key and not bucket.queued and bucket.timer is None:
+                del self.buckets[key]
+
+    async def call(self, name: str, *args, priority: Optional[int] = None, **kwargs):
+        """Call client.<name>(...) under the rate limits of its Slack method"""
+        # users_info -> users.info, chat_postMessage -> chat.postMessage
+        api_method = name.replace("_", ".", 1)
+        if priority is None:
+            priority = METHOD_LIMITS.get(api_method, DEFAULT_LIMIT)[1]
+        bucket = self._bucket(api_method, kwargs)
+        self.calls[api_method] += 1
+
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            await bucket.acquire(priority)
+            await self.inflight.acquire(priority)
+            waited = time.monotonic() - started
+            if waited > 0.001:
+                self.throttled[api_method] += 1
+                self.throttle_wait[api_method] += waited
+
+            try:
+                return await getattr(self.client, name)(*args, **kwargs)
+            except SlackApiError as e:
+                response = getattr(e, "response", None)
+                if getattr(response, "status_code", None) != 429 or attempt >= self.max_retries:
+                    raise
+                retry_after = float(response.headers.get("Retry-After", 1))
+                attempt += 1
+                self.rate_limited[api_method] += 1
+                bucket.block(retry_after)
+                logger.warning(f"Slack rate limited {api_method}, retry {attempt} after {retry_after}s")
+            finally:
+                self.inflight.release()
+
+            # Jitter so requeued calls do not all fire the moment the block lifts
+            await asyncio.sleep(random.uniform(0, SLACK_RATE_LIMIT_JITTER))
+
+    def stats(self) -> Dict[str, Any]:
+        """Throttle waits, 429s and queue depth per Slack method"""
+        return {
+            "inflight": self.inflight.inflight,
+            "inflight_queued": self.inflight.queued,
+            "methods": {
+                method: {
+                    "calls": self.calls[method],
+                    "throttled": self.throttled[method],
+                    "throttle_wait_seconds": round(self.throttle_wait[method], 3),
+                    "rate_limited": self.rate_limited[method]
+                }
+                for method in self.calls
+            },
+            "queued": {key: bucket.queued for key, bucket in self.buckets.items() if bucket.queued}
+        }
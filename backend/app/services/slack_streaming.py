@@ -0,0 +1,129 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Any, Optional
+from slack_sdk.errors import SlackApiError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Streaming reply settings
+SLACK_STREAM_UPDATE_INTERVAL = float(os.getenv("SLACK_STREAM_UPDATE_INTERVAL", "1.0"))
+SLACK_STREAM_PLACEHOLDER = os.getenv("SLACK_STREAM_PLACEHOLDER", "_Thinking..._")
+
+class StreamingMetrics:
+    """Time-to-first-visible-token and update counts across streamed replies"""
+
+    def __init__(self, window: int = 500):
+        self.ttft: deque = deque(maxlen=window)
+        self.placeholder_latency: deque = deque(maxlen=window)
+        self.streams = 0
+        self.updates = 0
+        self.skipped_updates = 0
+        self.update_errors = 0
+
+    @staticmethod
+    def _percentile(samples: deque, percentile: float) -> Optional[float]:
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * percentile))] * 1000, 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "streams": self.streams,
+            "updates": self.updates,
+            "skipped_updates": self.skipped_updates,
+            "update_errors": self.update_errors,
+            "placeholder_p50_ms": self._percentile(self.placeholder_latency, 0.5),
+            "ttft_p50_ms": self._percentile(self.ttft, 0.5),
+            "ttft_p95_ms": self._percentile(self.ttft, 0.95)
+        }
+
+streaming_metrics = StreamingMetrics()
+
+class SlackStreamingReply:
+    """A Slack message that is posted as a placeholder and edited as the reply streams in.
+
+    update() only records the latest text. At most one chat.update is in
+    flight per reply and a new one starts no sooner than `interval` after
+    the last, so a fast stream collapses into a few edits instead of queueing
+    one per chunk behind the channel's chat.update rate limit. finish()
+    writes the final text.
+    """
+
+    def __init__(
+        self,
+        client,
+        channel: str,
+        thread_ts: Optional[str] = None,
+        interval: float = SLACK_STREAM_UPDATE_INTERVAL,
+        metrics: StreamingMetrics = streaming_metrics
+    ):
+        self.client = client
+        self.channel = channel
+        self.thread_ts = thread_ts
+        self.interval = interval
+        self.metrics = metrics
+        self.ts: Optional[str] = None
+        self.text = ""
+        self.started = 0.0
+        self.last_update = 0.0
+        self.first_visible: Optional[float] = None
+        self.pending: Optional[asyncio.Task] = None
+
+    async def start(self, placeholder: str = SLACK_STREAM_PLACEHOLDER) -> None:
+        """Post the placeholder message the reply will be written into"""
+        self.started = time.perf_counter()
+        response = await self.client.chat_postMessage(
+            channel=self.channel,
+            text=placeholder,
+            thread_ts=self.thread_ts
+        )
+        self.ts = response["ts"]
+        self.metrics.streams += 1
+        self.metrics.placeholder_latency.append(time.perf_counter() - self.started)
+
+    def update(self, text: str) -> None:
+        """Record the text so far and push it to Slack if the cadence allows"""
+        self.text = text
+        if self.pending is not None or time.perf_counter() - self.last_update < self.interval:
+            self.metrics.skipped_updates += 1
+            return
+        self.pending = asyncio.ensure_future(self._flush())
+
+    async def _flush(self) -> None:
+        text = self.text
+        try:
+            await self.client.chat_update(channel=self.channel, ts=self.ts, text=text)
+            self.metrics.updates += 1
+            self._mark_visible()
+        except SlackApiError as e:
+            # The final update still carries the full text
+            self.metrics.update_errors += 1
+            logger.warning(f"Error updating streamed reply: {str(e)}")
+        finally:
+            self.last_update = time.perf_counter()
+            self.pending = None
+
+    def _mark_visible(self) -> None:
+        if self.first_visible is None:
+            self.first_visible = time.perf_counter()
+            self.metrics.ttft.append(self.first_visible - self.started)
+
+    async def finish(self, text: str) -> None:
+        """Write the final text once any in-flight update has landed"""
+        if self.pending is not None:
+            await self.pending
+        self.text = text
+        await self.client.chat_update(channel=self.channel, ts=self.ts, text=text)
+        self.metrics.updates += 1
+        self._mark_visible()
+        logger.info(
+            f"Streamed reply to {self.channel}: first text after "
+            f"{(self.first_visible - self.started) * 1000:.0f}ms, "
+            f"done after {(time.perf_counter() - self.started) * 1000:.0f}ms"
+        )
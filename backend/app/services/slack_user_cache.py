@@ -0,0 +1,189 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Iterable
+from slack_sdk.errors import SlackApiError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# User cache settings
+SLACK_USER_CACHE_SIZE = int(os.getenv("SLACK_USER_CACHE_SIZE", "50000"))
+SLACK_USER_CACHE_TTL = int(os.getenv("SLACK_USER_CACHE_TTL", "3600"))
+SLACK_USER_NEGATIVE_TTL = int(os.getenv("SLACK_USER_NEGATIVE_TTL", "300"))
+SLACK_USER_PRELOAD_PAGE_SIZE = int(os.getenv("SLACK_USER_PRELOAD_PAGE_SIZE", "200"))
+SLACK_USER_FETCH_CONCURRENCY = int(os.getenv("SLACK_USER_FETCH_CONCURRENCY", "10"))
+
+def build_user_info(user_id: str, user: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a Slack user object into the user info dict passed to MCP"""
+    profile = user.get("profile", {})
+    return {
+        "id": user_id,
+        "name": (
+            profile.get("display_name")
+            or profile.get("real_name")
+            or user.get("real_name")
+            or user.get("name")
+            or f"User_{user_id[-4:]}"
+        ),
+        "email": profile.get("email"),
+        "is_bot": user.get("is_bot", False),
+        "team_id": user.get("team_id"),
+        "real_name": profile.get("real_name"),
+        "display_name": profile.get("display_name")
+    }
+
+def unknown_user_info(user_id: str) -> Dict[str, Any]:
+    """Placeholder user info for ids Slack could not resolve"""
+    return {
+        "id": user_id,
+        "name": f"User_{user_id[-4:]}",
+        "email": None,
+        "is_bot": False
+    }
+
+class SlackUserCache:
+    """LRU + TTL cache of Slack user profiles shared by every event.
+
+    Failed lookups are cached as negative entries with a shorter TTL so a
+    deleted or external user does not cost a users_info call per message.
+    The cache is warmed from users.list at startup and kept fresh from
+    user_change events. Misses are fetched single-flight: concurrent
+    callers asking for the same user share one in-flight users_info call,
+    and at most fetch_concurrency calls run at once.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_entries: int = SLACK_USER_CACHE_SIZE,
+        ttl: int = SLACK_USER_CACHE_TTL,
+        negative_ttl: int = SLACK_USER_NEGATIVE_TTL,
+        fetch_concurrency: int = SLACK_USER_FETCH_CONCURRENCY
+    ):
+        self.client = client
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # user id -> (expires_at, user info or None for a negative entry)
+        self.entries: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.fetch_semaphore = asyncio.Semaphore(fetch_concurrency)
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.preloaded = 0
+        self.coalesced = 0
+
+    def _store(self, user_id: str, info: Optional[Dict[str, Any]]) -> None:
+        ttl = self.ttl if info is not None else self.negative_ttl
+        self.entries[user_id] = (time.monotonic() + ttl, info)
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, user_id: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Return (found, info) from the cache without calling Slack"""
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return False, None
+        expires_at, info = entry
+        if expires_at <= time.monotonic():
+            del self.entries[user_id]
+            return False, None
+        self.entries.move_to_end(user_id)
+        return True, info
+
+    async def get_user(self, user_id: str) -> Dict[str, Any]:
+        """Get user info for user_id, calling users_info only on a cache miss"""
+        found, info = self.lookup(user_id)
+        if found:
+            if info is None:
+                self.negative_hits += 1
+                return unknown_user_info(user_id)
+            self.hits += 1
+            return info
+
+        self.misses += 1
+        task = self.inflight.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(user_id))
+            self.inflight[user_id] = task
+            task.add_done_callback(lambda _: self.inflight.pop(user_id, None))
+        else:
+            self.coalesced += 1
+        # Shielded so one cancelled caller does not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    async def _fetch(self, user_id: str) -> Dict[str, Any]:
+        async with self.fetch_semaphore:
+            try:
+                user_info = await self.client.users_info(user=user_id)
+                if not user_info["ok"]:
+                    raise SlackApiError("Failed to get user info", user_info)
+                info = build_user_info(user_id, user_info["user"])
+            except SlackApiError as e:
+                logger.error(f"Error getting user info: {str(e)}")
+                info = None
+
+        self._store(user_id, info)
+        return info if info is not None else unknown_user_info(user_id)
+
+    async def get_users(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Resolve many users at once: each distinct id once, misses fetched concurrently"""
+        unique = list({uid for uid in user_ids if uid})
+        results = await asyncio.gather(*(self.get_user(uid) for uid in unique))
+        return dict(zip(unique, results))
+
+    def update_from_event(self, user: Dict[str, Any]) -> None:
+        """Refresh one profile from a user_change/team_join event payload"""
+        user_id = user.get("id")
+        if not user_id:
+            return
+        if user.get("deleted"):
+            self._store(user_id, None)
+        else:
+            self._store(user_id, build_user_info(user_id, user))
+
+    async def preload(self, page_size: int = SLACK_USER_PRELOAD_PAGE_SIZE) -> int:
+        """Warm the cache with the whole workspace directory via paginated users.list"""
+        loaded = 0
+        cursor = None
+        try:
+            while loaded < self.max_entries:
+                response = await self.client.users_list(cursor=cursor, limit=page_size)
+                for user in response.get("members", []):
+                    if user.get("deleted"):
+                        continue
+                    self._store(user["id"], build_user_info(user["id"], user))
+                    loaded += 1
+                cursor = (response.get("response_metadata") or {}).get("next_cursor")
+                if not cursor:
+                    break
+        except Exception as e:
+            # A cold cache only costs extra lookups, so never fail startup over it
+            logger.error(f"Error preloading Slack users: {str(e)}")
+        self.preloaded += loaded
+        logger.info(f"Preloaded {loaded} Slack user profiles")
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "inflight": len(self.inflight),
+            "evictions": self.evictions,
+            "preloaded": self.preloaded
+        }
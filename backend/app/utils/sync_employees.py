@@ -1,9 +1,9 @@
 import os
 import logging
 import aiohttp
-from datetime import datetime
 from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from dotenv import load_dotenv
 
 from app.database.base import SessionLocal, engine
@@ -11,7 +11,10 @@ from app.models.employee import Employee
 from app.models.company import Company
 from app.services.greyt_hr import GreytHRLeaveAPI
 from app.core.config import get_settings
-from app.services.greyt_hr_auth import get_and_store_greythr_token
+from app.services.greyt_hr_tokens import token_manager
+from app.services.greyt_hr_client import GreytHRHttpClient, greythr_http
+from app.services.employee_directory import employee_directory
+from app.services.slack_client import slack_client
 
 # Load environment variables
 load_dotenv()
@@ -26,9 +29,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# users.list page size when matching employees to Slack users
+SLACK_LINK_PAGE_SIZE = int(os.getenv("SLACK_LINK_PAGE_SIZE", "200"))
+
+async def fetch_slack_user_ids_by_email(page_size: int = SLACK_LINK_PAGE_SIZE) -> Dict[str, str]:
+    """Page through users.list and map lower-cased profile email -> Slack user id"""
+    slack_ids = {}
+    cursor = None
+    while True:
+        response = await slack_client.users_list(cursor=cursor, limit=page_size)
+        for user in response.get("members", []):
+            email = (user.get("profile") or {}).get("email")
+            if email and not user.get("deleted") and not user.get("is_bot"):
+                slack_ids[email.strip().lower()] = user["id"]
+        cursor = (response.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            break
+    return slack_ids
+
 class GreytHREmployeeSync:
-    def __init__(self, company: Company):
+    def __init__(self, company: Company, http: GreytHRHttpClient = greythr_http):
         self.company = company
+        self.http = http
         self.id = company.id
         # Get the base URL from config
         self.base_url = settings.GREYT_HR_API_BASE_URL
@@ -36,20 +58,19 @@ class GreytHREmployeeSync:
         # Format: {company_name}.greythr.com
         self.domain = f"{company.name.lower().replace(' ', '').replace('-', '')}.greythr.com"
 
-    async def get_company_token(self, db: Session) -> Optional[str]:
-        """Get company's access token from database"""
+    async def get_company_token(self, db: AsyncSession) -> Optional[str]:
+        """Get company's access token from the token manager"""
         if not self.company:
             raise Exception(f"Company object not found")
             
-        if not self.company.access_token or self.company.token_expiry and self.company.token_expiry < datetime.utcnow():
-            # Use the async function properly
-            await get_and_store_greythr_token(self.company, db)
+        # Refreshed in the background, so pagination never stops to re-authenticate
+        token = await token_manager.get_token(self.company.id)
             
         logger.info(f"Using domain: {self.domain}")
             
-        return self.company.access_token
+        return token
 
-    async def get_employees_page(self, db: Session, page: int, size: int = 25) -> Dict[str, Any]:
+    async def get_employees_page(self, db: AsyncSession, page: int, size: int = 25) -> Dict[str, Any]:
         """Get a single page of employees from GreytHR"""
         token = await self.get_company_token(db)
         if not token:
@@ -71,33 +92,33 @@ class GreytHREmployeeSync:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    employees_url,
-                    headers=headers,
-                    params=params,
-                    allow_redirects=False
-                ) as response:
-                    if response.status == 302:  # Redirect
-                        location = response.headers.get('Location', '')
-                        logger.error(f"Got redirect to: {location}")
-                        raise Exception(f"Authentication failed - redirected to login")
-                        
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Failed to get employees. Status: {response.status}")
-                        logger.error(f"Response headers: {dict(response.headers)}")
-                        logger.error(f"Response body: {error_text}")
-                        
-                        if response.status == 403:
-                            logger.error("Access forbidden. Please check:")
-                            logger.error(f"1. Domain in database: {self.domain}")
-                            logger.error(f"2. Token: {token[:10]}...")
-                            logger.error("3. Make sure the domain matches your company's GreytHR domain exactly")
-                        
-                        raise Exception(f"Failed to get employees: {error_text}")
+            session = self.http.session
+            async with session.get(
+                employees_url,
+                headers=headers,
+                params=params,
+                allow_redirects=False
+            ) as response:
+                if response.status == 302:  # Redirect
+                    location = response.headers.get('Location', '')
+                    logger.error(f"Got redirect to: {location}")
+                    raise Exception(f"Authentication failed - redirected to login")
+                    
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"Failed to get employees. Status: {response.status}")
+                    logger.error(f"Response headers: {dict(response.headers)}")
+                    logger.error(f"Response body: {error_text}")
+                    
+                    if response.status == 403:
+                        logger.error("Access forbidden. Please check:")
+                        logger.error(f"1. Domain in database: {self.domain}")
+                        logger.error(f"2. Token: {token[:10]}...")
+                        logger.error("3. Make sure the domain matches your company's GreytHR domain exactly")
                     
-                    return await response.json()
+                    raise Exception(f"Failed to get employees: {error_text}")
+                
+                return await response.json()
         except aiohttp.ClientError as e:
             logger.error(f"Network error: {str(e)}")
             raise Exception(f"Network error while fetching employees: {str(e)}")
@@ -105,7 +126,7 @@ class GreytHREmployeeSync:
             logger.error(f"Unexpected error: {str(e)}")
             raise
 
-    async def get_all_employees(self, db: Session) -> List[Dict[str, Any]]:
+    async def get_all_employees(self, db: AsyncSession) -> List[Dict[str, Any]]:
         """Get all employees from GreytHR using pagination"""
         all_employees = []
         page = 1
@@ -140,7 +161,7 @@ class GreytHREmployeeSync:
 
         return all_employees
 
-    async def sync_to_database(self, db: Session) -> None:
+    async def sync_to_database(self, db: AsyncSession) -> None:
         """Sync employees from GreytHR to our database"""
         try:
             # Get all employees from GreytHR
@@ -154,10 +175,11 @@ class GreytHREmployeeSync:
             
             for emp_data in employees:
                 # Check if employee exists for this company by employee_id (primary check)
-                existing_by_id = db.query(Employee).filter_by(
+                result = await db.execute(select(Employee).filter_by(
                     employee_id=emp_data["employee_id"],
                     company_id=self.company.id
-                ).first()
+                ))
+                existing_by_id = result.scalars().first()
                 
                 if existing_by_id:
                     # Employee already exists with this employee_id, skip
@@ -177,23 +199,59 @@ class GreytHREmployeeSync:
                     created += 1
                     logger.info(f"Created new employee {emp_data['name']} with employee_id {emp_data['employee_id']}")
             
-            db.commit()
+            await db.commit()
             logger.info(f"Sync completed for {self.company.name}: {created} created, {updated} updated, {skipped} skipped")
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error syncing employees: {str(e)}")
             raise
 
-    async def delete_company_employees(self, db: Session) -> None:
+        # Match employees to Slack users so messages resolve without a lookup
+        await self.link_slack_users(db)
+        # Swap in a directory that includes the new employees and links
+        await employee_directory.reload()
+
+    async def link_slack_users(self, db: AsyncSession) -> int:
+        """Fill employees.slack_user_id in bulk by matching emails against users.list"""
+        try:
+            slack_ids = await fetch_slack_user_ids_by_email()
+            result = await db.execute(
+                select(Employee.id, Employee.email, Employee.slack_user_id).filter_by(company_id=self.company.id)
+            )
+            
+            # Only rows whose match changed; unmatched rows are cleared
+            changes = []
+            for id, email, current in result.all():
+                slack_user_id = slack_ids.get(email.strip().lower())
+                if slack_user_id != current:
+                    changes.append({"id": id, "slack_user_id": slack_user_id})
+            
+            if changes:
+                # ORM bulk UPDATE by primary key: one executemany round trip
+                await db.execute(update(Employee), changes)
+                await db.commit()
+            logger.info(f"Linked Slack users for {self.company.name}: {len(changes)} employees updated")
+            return len(changes)
+            
+        except Exception as e:
+            # Messages still fall back to matching by email, so never fail the sync over it
+            await db.rollback()
+            logger.error(f"Error linking Slack users: {str(e)}")
+            return 0
+
+    async def delete_company_employees(self, db: AsyncSession) -> None:
         """Delete all employees for this company from the database"""
         try:
             # Delete all employees for this company
-            deleted = db.query(Employee).filter_by(company_id=self.company.id).delete()
-            db.commit()
+            result = await db.execute(delete(Employee).filter_by(company_id=self.company.id))
+            deleted = result.rowcount
+            await db.commit()
             logger.info(f"Deleted {deleted} employees for company {self.company.name}")
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error deleting employees: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+        await employee_directory.reload()
\ No newline at end of file
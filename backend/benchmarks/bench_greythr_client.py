@@ -0,0 +1,89 @@
+"""
+Requests per second against GreytHR: a new ClientSession per call vs the shared pooled client.
+
+Each simulated request is one leave balance GET against a local stand-in
+GreytHR server with a fixed latency. The server runs plain HTTP, so the
+gap shown covers TCP connection setup only; against the real service
+every fresh session also pays a DNS lookup and a TLS handshake.
+
+Usage (from backend/):
+    python -m benchmarks.bench_greythr_client --requests 2000 --concurrency 50 --latency 0.01
+"""
+import time
+import asyncio
+import argparse
+import threading
+import aiohttp
+from aiohttp import web
+from app.services.greyt_hr_client import GreytHRHttpClient
+
+def run_fake_greythr(port: int, latency: float, ready: threading.Event) -> None:
+    """Serve the leave balance endpoint on its own loop/thread"""
+    async def balance(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.json_response({"list": [{"leaveTypeCategory": {"description": "Casual Leave"}, "balance": 4}]})
+
+    async def serve() -> None:
+        app = web.Application()
+        app.router.add_get("/leave/v2/employee/{employee_id}/years/{year}/balance", balance)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port, backlog=1024).start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+HEADERS = {"ACCESS-TOKEN": "bench", "x-greythr-domain": "bench.greythr.com"}
+
+async def session_per_call(url: str) -> None:
+    # What GreytHRLeaveAPI did before: a fresh session (and connection) per request
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, headers=HEADERS) as response:
+            await response.json()
+
+def pooled_call(client: GreytHRHttpClient):
+    async def call(url: str) -> None:
+        async with client.session.get(url, headers=HEADERS) as response:
+            await response.json()
+    return call
+
+async def run(call, url: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            await call(url)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+async def main(args: argparse.Namespace) -> None:
+    url = f"http://127.0.0.1:{args.port}/leave/v2/employee/1/years/2026/balance"
+
+    before = await run(session_per_call, url, args.requests, args.concurrency)
+
+    client = GreytHRHttpClient(pool_size=args.concurrency, per_host=args.concurrency)
+    await client.start()
+    try:
+        after = await run(pooled_call(client), url, args.requests, args.concurrency)
+    finally:
+        await client.close()
+
+    print(f"requests={args.requests} concurrency={args.concurrency} latency={args.latency * 1000:.0f}ms")
+    print(f"before (session per call):  {before:8.1f} req/s")
+    print(f"after  (shared pool):       {after:8.1f} req/s  ({after / before:.1f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds per fake GreytHR call")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    ready = threading.Event()
+    threading.Thread(target=run_fake_greythr, args=(args.port, args.latency, ready), daemon=True).start()
+    ready.wait()
+    asyncio.run(main(args))
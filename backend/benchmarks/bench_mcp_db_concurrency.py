@@ -0,0 +1,65 @@
+"""
+Load test: concurrent MCP employee lookups on one shared sync Session vs per-request async sessions.
+
+Each simulated MCP request runs the employee-by-email query plus a
+`pg_sleep` standing in for a slow query. With the old module-level
+`db = next(get_db())` every request blocks the event loop on the same
+connection, so requests queue behind each other; with AsyncSessionLocal
+each request gets its own pooled asyncpg connection.
+
+Needs the POSTGRES_* environment variables used by the app.
+
+Usage (from backend/):
+    python -m benchmarks.bench_mcp_db_concurrency --requests 100 --concurrency 20 --query-latency 0.02
+"""
+import time
+import asyncio
+import argparse
+from sqlalchemy import select, text
+from app.database.base import SessionLocal, AsyncSessionLocal, async_engine
+from app.models.employee import Employee
+
+async def shared_sync_session(requests: int, latency: float, email: str) -> float:
+    db = SessionLocal()
+
+    async def one() -> None:
+        # Same shape as the old get_employee_by_email: blocking calls inside async def
+        db.execute(text("SELECT pg_sleep(:s)"), {"s": latency})
+        db.query(Employee).filter_by(email=email).first()
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+async def per_request_async_sessions(requests: int, latency: float, email: str, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore, AsyncSessionLocal() as db:
+            await db.execute(text("SELECT pg_sleep(:s)"), {"s": latency})
+            result = await db.execute(select(Employee).filter_by(email=email))
+            result.scalars().first()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return time.perf_counter() - started
+
+async def main(args: argparse.Namespace) -> None:
+    before = await shared_sync_session(args.requests, args.query_latency, args.email)
+    after = await per_request_async_sessions(args.requests, args.query_latency, args.email, args.concurrency)
+    await async_engine.dispose()
+
+    print(f"requests={args.requests} concurrency={args.concurrency} query latency={args.query_latency * 1000:.0f}ms")
+    print(f"shared sync Session:       {before:6.2f}s  {args.requests / before:8.1f} req/s")
+    print(f"per-request AsyncSession:  {after:6.2f}s  {args.requests / after:8.1f} req/s  ({before / after:.1f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20, help="should not exceed the async pool size + overflow")
+    parser.add_argument("--query-latency", type=float, default=0.02)
+    parser.add_argument("--email", default="bench@example.com")
+    asyncio.run(main(parser.parse_args()))
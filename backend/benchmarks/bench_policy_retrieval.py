@@ -0,0 +1,87 @@
+"""
+Regression benchmark: prompt tokens and retrieval latency with policy retrieval vs the full policy.
+
+Builds the HR bot prompt for a fixed set of questions twice, once with
+all of LEAVE_POLICY and once with the sections policy_index picks, and
+times policy_index.search over many runs. Token counts use the same
+4-characters-per-token estimate as the index. Exits non-zero when the
+mean retrieved prompt or the p95 search latency passes its limit, so it
+can run in CI.
+
+Usage (from backend/):
+    python -m benchmarks.bench_policy_retrieval --iterations 2000 --max-prompt-tokens 1500 --max-p95-us 500
+"""
+import sys
+import time
+import argparse
+from datetime import datetime
+from app.core.prompts import get_hr_bot_prompt, LEAVE_POLICY
+from app.services.policy_index import policy_index, estimate_tokens
+
+QUESTIONS = [
+    "How many leaves do I have left?",
+    "Can I work from home next Friday?",
+    "How many ELs can I encash this year?",
+    "I worked on Sunday, do I get a comp off?",
+    "How much paternity leave do I get?",
+    "What is the maternity leave policy?",
+    "How early do I need to apply for leave?",
+    "What happens if I take unplanned leave?",
+    "Can I carry forward my unused earned leave?",
+    "Can I take half a day off?",
+]
+
+LEAVE_INFO = {
+    "balance": {"EL": 12.5, "CL": 2},
+    "transactions": [{"type": "EL", "from": "2024-05-02", "to": "2024-05-03", "status": "APPROVED"}],
+    "last_updated": datetime.now().isoformat()
+}
+
+def prompt_tokens(question: str, leave_policy: str) -> int:
+    return estimate_tokens(get_hr_bot_prompt(
+        user_name="bench",
+        channel_type="dm",
+        conversation_history="",
+        user_message=question,
+        leave_info=LEAVE_INFO,
+        leave_policy=leave_policy
+    ).text)
+
+def main(args: argparse.Namespace) -> int:
+    full = [prompt_tokens(question, LEAVE_POLICY) for question in QUESTIONS]
+    retrieved = [prompt_tokens(question, policy_index.relevant_policy(question)) for question in QUESTIONS]
+
+    for question, before, after in zip(QUESTIONS, full, retrieved):
+        sections = ", ".join(section.title for section in policy_index.search(question)) or "-"
+        print(f"{before:5d} -> {after:5d} tokens  {question:45s} [{sections}]")
+
+    latencies = []
+    for i in range(args.iterations):
+        question = QUESTIONS[i % len(QUESTIONS)]
+        started = time.perf_counter()
+        policy_index.search(question)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1e6
+
+    mean_full = sum(full) / len(full)
+    mean_retrieved = sum(retrieved) / len(retrieved)
+    print(f"mean prompt tokens: full policy {mean_full:.0f}, retrieved {mean_retrieved:.0f} ({1 - mean_retrieved / mean_full:.0%} fewer)")
+    print(f"search latency: p50 {p50:.1f}us  p95 {p95:.1f}us over {args.iterations} searches")
+
+    failed = False
+    if mean_retrieved > args.max_prompt_tokens:
+        print(f"FAIL: mean prompt tokens {mean_retrieved:.0f} > {args.max_prompt_tokens}")
+        failed = True
+    if p95 > args.max_p95_us:
+        print(f"FAIL: p95 search latency {p95:.1f}us > {args.max_p95_us}us")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--max-prompt-tokens", type=int, default=1500)
+    parser.add_argument("--max-p95-us", type=float, default=500)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,78 @@
+"""
+Load test: the full process_with_llm / stream_with_llm path against the fake LLM backend.
+
+Sets LLM_BACKENDS=fake before the app is imported, so prompt building,
+the adaptive concurrency limiter and the backend chain all run as in
+production with no network. Leave information is passed in ready-made,
+so neither Postgres nor GreytHR is touched.
+
+Usage (from backend/):
+    python -m benchmarks.bench_process_with_llm --requests 200 --latency 0.3 --tokens-per-second 80
+"""
+import os
+import time
+import asyncio
+import argparse
+from datetime import datetime
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+async def main(args: argparse.Namespace) -> None:
+    os.environ["LLM_BACKENDS"] = "fake"
+    os.environ["FAKE_LLM_LATENCY"] = str(args.latency)
+    os.environ["FAKE_LLM_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+    os.environ["FAKE_LLM_REPLY_TOKENS"] = str(args.reply_tokens)
+    from app.api.endpoints.mcp import (
+        process_with_llm, stream_with_llm, llm, llm_limiter,
+        MessageContext, ChannelInfo, UserInfo
+    )
+
+    context = MessageContext(
+        channel=ChannelInfo(id="D0BENCH", name="bench", type="dm"),
+        user=UserInfo(id="U0BENCH", name="bench", email="bench@example.com"),
+        history=[],
+        event_type="direct_message"
+    )
+    leave_context = {
+        "email": "bench@example.com",
+        "employee": object(),
+        "leave_info": {
+            "balance": {"EL": 12.5, "CL": 2},
+            "transactions": [],
+            "last_updated": datetime.now().isoformat()
+        }
+    }
+
+    async def generate(i: int) -> float:
+        started = time.perf_counter()
+        await process_with_llm(f"How many leaves do I have? ({i})", context, leave_context)
+        return time.perf_counter() - started
+
+    async def stream(i: int) -> float:
+        started = time.perf_counter()
+        first = None
+        async for _ in stream_with_llm(f"How many leaves do I have? ({i})", context, leave_context):
+            first = first or time.perf_counter() - started
+        return first
+
+    for name, one in (("process_with_llm", generate), ("stream_with_llm (ttft)", stream)):
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        print(
+            f"{name:24s} {elapsed:6.2f}s  {args.requests / elapsed:7.1f} req/s  "
+            f"p50 {percentile(latencies, 0.5):7.1f}ms  p95 {percentile(latencies, 0.95):7.1f}ms"
+        )
+
+    print(f"limiter:  {llm_limiter.stats()}")
+    print(f"backends: {llm.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake time to first token, seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--reply-tokens", type=int, default=80)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,98 @@
+"""
+Concurrent-event throughput of the blocking WebClient vs the pooled AsyncWebClient.
+
+Each simulated event makes the same Slack calls as an app mention
+(users_info, conversations_history, conversations_info, chat_postMessage)
+against a local stand-in Slack API with a fixed per-call latency.
+
+Usage (from backend/):
+    python -m benchmarks.bench_slack_client --events 200 --concurrency 50 --latency 0.05
+"""
+import time
+import asyncio
+import argparse
+import threading
+import aiohttp
+from aiohttp import web
+from slack_sdk import WebClient
+from slack_sdk.web.async_client import AsyncWebClient
+
+def run_fake_slack(port: int, latency: float, ready: threading.Event) -> None:
+    """Serve a minimal Slack Web API on its own loop/thread so blocking clients cannot stall it"""
+    async def handle(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        method = request.match_info["method"]
+        payload = {"ok": True}
+        if method == "users.info":
+            payload["user"] = {"id": "U1", "name": "bench", "profile": {"display_name": "bench"}}
+        elif method == "conversations.history":
+            payload["messages"] = []
+        elif method == "conversations.info":
+            payload["channel"] = {"id": "C1", "name": "general"}
+        return web.json_response(payload)
+
+    async def serve() -> None:
+        app = web.Application()
+        app.router.add_route("*", "/api/{method}", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+async def sync_event(client: WebClient) -> None:
+    # What slack.py/mcp.py did before: blocking calls inside async handlers
+    client.users_info(user="U1")
+    client.conversations_history(channel="C1", limit=10)
+    client.conversations_info(channel="C1")
+    client.chat_postMessage(channel="C1", text="hi")
+
+async def async_event(client: AsyncWebClient) -> None:
+    await client.users_info(user="U1")
+    await client.conversations_history(channel="C1", limit=10)
+    await client.conversations_info(channel="C1")
+    await client.chat_postMessage(channel="C1", text="hi")
+
+async def run(event, client, events: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            await event(client)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(events)))
+    return events / (time.perf_counter() - started)
+
+async def main(args: argparse.Namespace) -> None:
+    base_url = f"http://127.0.0.1:{args.port}/api/"
+
+    sync_client = WebClient(token="xoxb-bench", base_url=base_url)
+    before = await run(sync_event, sync_client, args.events, args.concurrency)
+
+    session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=args.pool_size))
+    async_client = AsyncWebClient(token="xoxb-bench", base_url=base_url, session=session)
+    try:
+        after = await run(async_event, async_client, args.events, args.concurrency)
+    finally:
+        await session.close()
+
+    print(f"events={args.events} concurrency={args.concurrency} latency={args.latency * 1000:.0f}ms/call")
+    print(f"before (blocking WebClient): {before:8.1f} events/s")
+    print(f"after  (pooled async client): {after:8.1f} events/s  ({after / before:.1f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake Slack call")
+    parser.add_argument("--pool-size", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    ready = threading.Event()
+    threading.Thread(target=run_fake_slack, args=(args.port, args.latency, ready), daemon=True).start()
+    ready.wait()
+    asyncio.run(main(args))
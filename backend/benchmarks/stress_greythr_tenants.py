@@ -0,0 +1,157 @@
+"""
+Concurrency stress test: many tenants sharing one GreytHR leave client.
+
+A local stand-in GreytHR server rejects any request whose ACCESS-TOKEN
+does not belong to the tenant named in x-greythr-domain. Requests for
+random tenants are fired concurrently through:
+
+  shared state  the old GreytHRLeaveAPI shape, which wrote the tenant's
+                domain onto the shared instance and then awaited the token
+  tenant client one cached GreytHRTenantClient per company
+
+Any cross-tenant mismatch is a failure; the tenant clients must report 0.
+
+Usage (from backend/):
+    python -m benchmarks.stress_greythr_tenants --tenants 200 --requests 20000 --concurrency 500
+"""
+import time
+import random
+import asyncio
+import argparse
+import threading
+from typing import Dict, List
+from aiohttp import web
+from app.services.greyt_hr_client import GreytHRHttpClient
+from app.services.greyt_hr_tenant import GreytHRTenantClient
+
+def token_for(company_id: str) -> str:
+    return f"token-{company_id}"
+
+def domain_for(company_id: str) -> str:
+    return f"{company_id}.greythr.com"
+
+def run_fake_greythr(port: int, latency: float, ready: threading.Event) -> None:
+    """Serve the leave balance endpoint, checking the token matches the domain"""
+    async def balance(request: web.Request) -> web.Response:
+        await asyncio.sleep(random.uniform(0, latency))
+        company_id = request.headers.get("x-greythr-domain", "").split(".")[0]
+        if request.headers.get("ACCESS-TOKEN") != token_for(company_id):
+            return web.json_response({"error": "token does not belong to this domain"}, status=403)
+        return web.json_response({"company": company_id, "employee": request.match_info["employee_id"]})
+
+    async def serve() -> None:
+        app = web.Application()
+        app.router.add_get("/leave/v2/employee/{employee_id}/years/{year}/balance", balance)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port, backlog=4096).start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+class FakeTokens:
+    """Token source that yields to the loop like the real manager can"""
+
+    async def get_token(self, company_id: str) -> str:
+        await asyncio.sleep(0)
+        return token_for(company_id)
+
+class SharedStateClient:
+    """The old GreytHRLeaveAPI shape: tenant state written onto one shared instance"""
+
+    def __init__(self, base_url: str, http: GreytHRHttpClient, tokens: FakeTokens):
+        self.base_url = base_url
+        self.http = http
+        self.tokens = tokens
+        self.domain = None
+
+    async def get_leave_balance(self, company_id: str, employee_id: int, year: int):
+        self.domain = domain_for(company_id)
+        token = await self.tokens.get_token(company_id)
+        headers = {"ACCESS-TOKEN": token, "x-greythr-domain": self.domain}
+        url = f"{self.base_url}/leave/v2/employee/{employee_id}/years/{year}/balance"
+        async with self.http.session.get(url, headers=headers) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to get leave balance: {await response.text()}")
+            return await response.json()
+
+async def run(call, tenants: List[str], requests: int, concurrency: int) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+    wrong_tenant = 0
+
+    async def one() -> None:
+        nonlocal failures, wrong_tenant
+        company_id = random.choice(tenants)
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                body = await call(company_id, random.randint(1, 1000))
+                if body.get("company") != company_id:
+                    wrong_tenant += 1
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "req_s": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "failures": failures,
+        "wrong_tenant": wrong_tenant
+    }
+
+def report(label: str, result: Dict[str, float]) -> None:
+    print(
+        f"{label:14} {result['req_s']:8.1f} req/s  p50 {result['p50_ms']:6.1f}ms  p99 {result['p99_ms']:6.1f}ms  "
+        f"rejected {result['failures']:6}  wrong tenant {result['wrong_tenant']}"
+    )
+
+async def main(args: argparse.Namespace) -> int:
+    base_url = f"http://127.0.0.1:{args.port}"
+    tenants = [f"tenant{i}" for i in range(args.tenants)]
+    tokens = FakeTokens()
+    http = GreytHRHttpClient(pool_size=args.concurrency, per_host=args.concurrency)
+    await http.start()
+    try:
+        shared = SharedStateClient(base_url, http, tokens)
+        before = await run(
+            lambda company_id, employee_id: shared.get_leave_balance(company_id, employee_id, 2026),
+            tenants, args.requests, args.concurrency
+        )
+
+        clients = {
+            company_id: GreytHRTenantClient(company_id, domain_for(company_id), base_url, http, tokens)
+            for company_id in tenants
+        }
+        after = await run(
+            lambda company_id, employee_id: clients[company_id].get_leave_balance(employee_id, 2026),
+            tenants, args.requests, args.concurrency
+        )
+    finally:
+        await http.close()
+
+    print(f"tenants={args.tenants} requests={args.requests} concurrency={args.concurrency}")
+    report("shared state", before)
+    report("tenant client", after)
+    return 1 if after["failures"] or after["wrong_tenant"] else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.005, help="max seconds per fake GreytHR call")
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    ready = threading.Event()
+    threading.Thread(target=run_fake_greythr, args=(args.port, args.latency, ready), daemon=True).start()
+    ready.wait()
+    raise SystemExit(asyncio.run(main(args)))
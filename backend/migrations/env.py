@@ -9,7 +9,7 @@ from alembic import context
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import all models
-from app.models import user, company, employee, user_company
+from app.models import user, company, employee, user_company, processed_event
 from app.database.base import Base
 
 # this is the Alembic Config object, which provides
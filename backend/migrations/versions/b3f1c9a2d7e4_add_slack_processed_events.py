@@ -0,0 +1,31 @@
+"""add_slack_processed_events
+
+Revision ID: b3f1c9a2d7e4
+Revises: a82b51f857e0
+Create Date: 2026-10-17 09:12:40.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f1c9a2d7e4'
+down_revision = 'a82b51f857e0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'slack_processed_events',
+        sa.Column('event_id', sa.String(length=255), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_index(op.f('ix_slack_processed_events_expires_at'), 'slack_processed_events', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_slack_processed_events_expires_at'), table_name='slack_processed_events')
+    op.drop_table('slack_processed_events')
@@ -0,0 +1,26 @@
+"""add_employee_slack_user_id
+
+Revision ID: c7d2e5f8a1b3
+Revises: b3f1c9a2d7e4
+Create Date: 2026-10-17 14:03:27.551906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d2e5f8a1b3'
+down_revision = 'b3f1c9a2d7e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('employees', sa.Column('slack_user_id', sa.String(length=32), nullable=True))
+    op.create_index(op.f('ix_employees_slack_user_id'), 'employees', ['slack_user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_employees_slack_user_id'), table_name='employees')
+    op.drop_column('employees', 'slack_user_id')